@@ -11,11 +11,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib
 
-from src.parser import parse_chat
-from src.analyzer import (
-    basic_stats, messages_per_sender, daily_timeline, hourly_timeline,
-    weekday_hour_heatmap, top_words, emoji_freq
-)
+from src.cache import ParseCache, cache_key
+from src.config import PARSE_CACHE, TIMEZONE
+from src.analyzer import AnalysisResult, analyze
+from src.dashboard import DailyRollup
+from src.downsample import lttb
 from src.visuals import plot_all
 from src.utils import ensure_dir
 
@@ -100,6 +100,35 @@ with st.sidebar:
     st.markdown("---")
     st.caption("Tip: Export from WhatsApp > More > Export chat (without media).")
 
+@st.cache_resource
+def _parse_cache() -> ParseCache:
+    # one cache per server process, shared by all sessions and reruns
+    return ParseCache(PARSE_CACHE)
+
+@st.cache_resource(max_entries=8)
+def _analysis(key: str, _df: pd.DataFrame) -> AnalysisResult:
+    # keyed by the upload hash; the frame itself is not hashed (leading underscore)
+    return analyze(_df)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _rollup(key: str, _df: pd.DataFrame) -> DailyRollup:
+    # per-day arrays only (kilobytes), so the copy cache_data hands out per rerun is cheap
+    return DailyRollup.from_frame(_df)
+
+def _upload_key(uploaded) -> str:
+    # hash each upload once per session instead of on every rerun
+    keys = st.session_state.setdefault("upload_keys", {})
+    if uploaded.file_id not in keys:
+        keys[uploaded.file_id] = cache_key(uploaded.getvalue(), TIMEZONE)
+    return keys[uploaded.file_id]
+
+# long timelines are downsampled to this many points (LTTB keeps peaks and dips)
+TIMELINE_POINTS = 1000
+
+def _show(fig):
+    st.pyplot(fig, use_container_width=True)
+    plt.close(fig)  # figures are rebuilt on every rerun; don't let pyplot keep them
+
 def _mpl_theme():
     plt.rcParams.update({
         "axes.facecolor": BG, "figure.facecolor": BG, "axes.edgecolor": FG,
@@ -118,8 +147,8 @@ def _emoji_font():
             continue
     return None
 
-def _plot_hourly(df: pd.DataFrame):
-    ha = hourly_timeline(df)
+def _plot_hourly(a: AnalysisResult):
+    ha = a.hourly_timeline()
     fig, ax = plt.subplots()
     ax.bar(ha["hour"], ha["messages"], color=PURPLE)
     ax.set_xticks(range(0,24,1))
@@ -127,23 +156,27 @@ def _plot_hourly(df: pd.DataFrame):
     ax.set_title("Hourly Message Distribution"); ax.grid(True, linestyle=":")
     return fig
 
-def _plot_daily(df: pd.DataFrame):
-    tl = daily_timeline(df); tl["date"] = pd.to_datetime(tl["date"])
+def _plot_daily(a: AnalysisResult):
+    tl = a.daily_timeline()
+    shown = tl.iloc[lttb(tl["date"].astype("int64"), tl["messages"], TIMELINE_POINTS)]
     fig, ax = plt.subplots()
-    ax.plot(tl["date"], tl["messages"], color=PURPLE, linewidth=2)
-    ax.set_xlabel("Date"); ax.set_ylabel("Messages"); ax.set_title("Daily Message Timeline")
+    ax.plot(shown["date"], shown["messages"], color=PURPLE, linewidth=2)
+    title = "Daily Message Timeline"
+    if len(shown) < len(tl):
+        title += f" ({len(shown)} of {len(tl)} days shown)"
+    ax.set_xlabel("Date"); ax.set_ylabel("Messages"); ax.set_title(title)
     ax.grid(True, linestyle=":"); fig.autofmt_xdate()
     return fig
 
-def _plot_mps(df: pd.DataFrame):
-    mps = messages_per_sender(df).head(15)
+def _plot_mps(a: AnalysisResult):
+    mps = a.messages_per_sender().head(15)
     fig, ax = plt.subplots()
     ax.barh(mps["sender"], mps["message_count"], color=PURPLE)
     ax.invert_yaxis(); ax.set_xlabel("Messages"); ax.set_title("Messages per Sender (Top 15)")
     return fig
 
-def _plot_heatmap(df: pd.DataFrame):
-    hm = weekday_hour_heatmap(df)
+def _plot_heatmap(a: AnalysisResult):
+    hm = a.weekday_hour_heatmap()
     fig, ax = plt.subplots()
     im = ax.imshow(hm.values, aspect="auto", cmap="magma")
     ax.set_yticks(range(7)); ax.set_yticklabels(hm.index.tolist())
@@ -151,15 +184,15 @@ def _plot_heatmap(df: pd.DataFrame):
     fig.colorbar(im, ax=ax, label="Messages")
     return fig
 
-def _plot_top_words(df: pd.DataFrame):
-    tw = top_words(df, 25)
+def _plot_top_words(a: AnalysisResult):
+    tw = a.top_words(25)
     fig, ax = plt.subplots()
     ax.barh(tw["word"][::-1], tw["count"][::-1], color=PURPLE)
     ax.set_title("Top Words")
     return fig
 
-def _plot_emojis(df: pd.DataFrame):
-    ef = emoji_freq(df, 25)
+def _plot_emojis(a: AnalysisResult):
+    ef = a.emoji_freq(25)
     fig, ax = plt.subplots()
     ax.barh(ef["emoji"][::-1], ef["count"][::-1], color=PURPLE)
     ax.set_title("Top Emojis")
@@ -167,15 +200,26 @@ def _plot_emojis(df: pd.DataFrame):
 
 # ---------- MAIN ----------
 if uploaded:
-    tmp = ROOT / "data" / "raw" / "_uploaded.txt"
-    ensure_dir(tmp.parent)
-    tmp.write_bytes(uploaded.getbuffer())
-    df = parse_chat(tmp)
+    key = _upload_key(uploaded)
+    df = _parse_cache().get(uploaded.getvalue(), TIMEZONE, key)
+    analysis = _analysis(key, df)
+    rollup = _rollup(key, df)
+    user_msgs = sum(analysis.aggregates.senders.values())
 
-    if df.empty or df["sender"].notna().sum() == 0:
+    if df.empty or user_msgs == 0:
         st.warning("Parsed, but no user messages detected. If your export format is unique, share a few sample lines.")
     else:
-        st.success(f"Parsed {len(df)} rows, {df['sender'].notna().sum()} user messages.")
+        st.success(f"Parsed {len(df)} rows, {user_msgs} user messages.")
+
+    # the date range re-aggregates the cached per-day counts, never the messages
+    window = analysis
+    first, last = rollup.first_day, rollup.last_day
+    if first is not None and first < last:
+        with st.sidebar:
+            since, until = st.slider("Date range", min_value=first.date(), max_value=last.date(),
+                                     value=(first.date(), last.date()), format="YYYY-MM-DD")
+        if (since, until) != (first.date(), last.date()):
+            window = rollup.between(since, until)
 
     if _emoji_font() is None:
         st.info("Note: Emojis may not render fully unless an emoji font (e.g., Segoe UI Emoji / Noto Color Emoji) is installed.")
@@ -187,11 +231,13 @@ if uploaded:
         st.markdown("</div>", unsafe_allow_html=True)
 
     _mpl_theme()
-    tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Activity", "Words & Emojis", "Reports"])
+    # only the selected view is built on a rerun (st.tabs would render every tab)
+    view = st.radio("View", ["Overview", "Activity", "Words & Emojis", "Reports"],
+                    horizontal=True, label_visibility="collapsed", key="view")
 
-    with tab1:
+    if view == "Overview":
         st.markdown('<div class="section">', unsafe_allow_html=True)
-        stats = basic_stats(df)
+        stats = window.basic_stats()
         c1, c2, c3, c4, c5 = st.columns(5)
         c1.metric("Messages", stats["total_messages"])
         c2.metric("Participants", len(stats["participants"]))
@@ -202,34 +248,37 @@ if uploaded:
 
         st.markdown('<div class="section">', unsafe_allow_html=True)
         colA, colB = st.columns((1,1))
-        with colA: st.pyplot(_plot_mps(df), use_container_width=True)
-        with colB: st.pyplot(_plot_hourly(df), use_container_width=True)
+        with colA: _show(_plot_mps(window))
+        with colB: _show(_plot_hourly(window))
         st.markdown("</div>", unsafe_allow_html=True)
 
-    with tab2:
+    elif view == "Activity":
         st.markdown('<div class="section">', unsafe_allow_html=True)
-        st.pyplot(_plot_daily(df), use_container_width=True)
+        _show(_plot_daily(window))
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown('<div class="section">', unsafe_allow_html=True)
-        st.pyplot(_plot_heatmap(df), use_container_width=True)
+        _show(_plot_heatmap(window))
         st.markdown("</div>", unsafe_allow_html=True)
 
-    with tab3:
+    elif view == "Words & Emojis":
         st.markdown('<div class="section">', unsafe_allow_html=True)
+        if window is not analysis:
+            st.caption("Words and emojis are counted over the whole chat, not the selected dates.")
         col1, col2 = st.columns((1,1))
-        with col1: st.pyplot(_plot_top_words(df), use_container_width=True)
-        with col2: st.pyplot(_plot_emojis(df), use_container_width=True)
+        with col1: _show(_plot_top_words(analysis))
+        with col2: _show(_plot_emojis(analysis))
         st.markdown("</div>", unsafe_allow_html=True)
 
-    with tab4:
+    else:
         st.markdown('<div class="section">', unsafe_allow_html=True)
         st.subheader("Generate and View Reports")
         outdir = ROOT / "reports"
         ensure_dir(outdir)
 
         if st.button("✨ Generate PNG charts"):
-            plot_all(df, outdir)
+            # render in-process: forking a pool from the threaded server is not safe
+            plot_all(df, outdir, analysis, workers=1)
             st.success(f"Charts saved to: {outdir.resolve()}")
 
         # show charts if exist
@@ -0,0 +1 @@
+"""Benchmarks and synthetic WhatsApp export generator (not shipped with src)."""
@@ -0,0 +1,70 @@
+"""Throughput of the enrichment stage (media flag, emoji, calendar columns) on its
+own, separate from line parsing.
+
+    python -m benchmarks.bench_enrichment --messages 200000
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+import emoji
+import pandas as pd
+
+from src.parser import MEDIA_MARKERS, enrich
+from .synth import EMOJI, SENDERS, WORDS
+
+def legacy_enrich(df: pd.DataFrame) -> pd.DataFrame:
+    """The original per-row loop, kept for comparison."""
+    rows = []
+    for ts, name, msg, is_system in df[["timestamp", "sender", "message", "is_system"]].itertuples(index=False):
+        ts = ts if pd.notna(ts) else None
+        text = (msg or "").strip()
+        emjs = [ch for ch in text if ch in emoji.EMOJI_DATA]
+        rows.append({
+            "timestamp": ts,
+            "date": ts.date().isoformat() if ts else None,
+            "time": ts.strftime("%H:%M:%S") if ts else None,
+            "weekday": ts.strftime("%A") if ts else None,
+            "hour": ts.hour if ts else None,
+            "sender": name,
+            "message": text,
+            "is_system": is_system,
+            "is_media": any(m in text for m in MEDIA_MARKERS),
+            "emoji_list": "".join(emjs),
+            "emoji_count": len(emjs),
+        })
+    return pd.DataFrame(rows)
+
+def synthetic_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    msgs = []
+    for _ in range(n):
+        words = rng.choices(WORDS, k=rng.randint(2, 12))
+        if rng.random() < 0.3:
+            words.append("".join(rng.choices(EMOJI, k=rng.randint(1, 3))))
+        if rng.random() < 0.05:
+            words = ["<Media omitted>"]
+        msgs.append(" ".join(words))
+    ts = pd.date_range("2020-01-01", periods=n, freq="7min", tz="Asia/Kolkata")
+    return pd.DataFrame({
+        "timestamp": ts,
+        "sender": rng.choices(SENDERS, k=n),
+        "message": msgs,
+        "is_system": False,
+    })
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=200_000)
+    args = ap.parse_args()
+    df = synthetic_frame(args.messages)
+    enrich(df.head(10))  # compile the emoji regex outside the timed section
+    for name, fn in (("before", legacy_enrich), ("after", enrich)):
+        t0 = time.perf_counter()
+        fn(df)
+        dt = time.perf_counter() - t0
+        print(f"{name:6s} {args.messages / dt:,.0f} msgs/s ({dt:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Lines/sec of the line classifier vs the old try-four-patterns approach.
+
+    python -m benchmarks.bench_line_classifier --lines 1000000
+"""
+from __future__ import annotations
+import argparse
+import re
+import time
+
+from src.parser import classify_line
+from .synth import iter_export_lines
+
+# The parser's original patterns, kept here as the baseline: user messages
+# (Android/iOS, with/without [brackets], with/without seconds) ...
+PATTERNS = [
+    re.compile(
+        r"^(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+        r"(?:\s?(?P<ampm>[AP]M))?\s-\s(?P<name>[^:]+): (?P<msg>.*)$",
+        re.IGNORECASE
+    ),
+    re.compile(
+        r"^\[(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+        r"(?:\s?(?P<ampm>[AP]M))?\]\s(?P<name>[^:]+): (?P<msg>.*)$",
+        re.IGNORECASE
+    ),
+]
+
+# ... and system messages (no sender), tried one after another
+SYS_PATTERNS = [
+    re.compile(
+        r"^(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+        r"(?:\s?(?P<ampm>[AP]M))?\s-\s(?P<msg>.*)$",
+        re.IGNORECASE
+    ),
+    re.compile(
+        r"^\[(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+        r"(?:\s?(?P<ampm>[AP]M))?\]\s(?P<msg>.*)$",
+        re.IGNORECASE
+    ),
+]
+
+def _match_any(line, pats):
+    for p in pats:
+        m = p.match(line)
+        if m:
+            return m
+    return None
+
+def legacy_classify(line: str):
+    return _match_any(line, PATTERNS) or _match_any(line, SYS_PATTERNS)
+
+def _rate(fn, lines: list[str]) -> float:
+    t0 = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - t0)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--multiline", type=float, default=0.5)
+    args = ap.parse_args()
+    for fmt in ("android", "ios"):
+        lines = list(iter_export_lines(args.lines, fmt, args.multiline))
+        before = _rate(legacy_classify, lines)
+        after = _rate(classify_line, lines)
+        print(f"{fmt:8s} before={before:,.0f} lines/s  after={after:,.0f} lines/s  "
+              f"speedup={after / before:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Word counting for top_words: per-character loop vs pandas string ops.
+
+    python -m benchmarks.bench_top_words --messages 1000000
+"""
+from __future__ import annotations
+import argparse
+from collections import Counter
+import random
+import time
+
+import pandas as pd
+
+from src.analyzer import EXCLUDE_TOKENS, STOPWORDS, _word_counter
+from .synth import WORDS
+
+def legacy_word_counter(messages) -> Counter:
+    """The original per-token loop, kept for comparison."""
+    counter = Counter()
+    for t in messages:
+        for w in t.lower().split():
+            w = "".join(ch for ch in w if ch.isalnum())
+            if not w or w.isdigit() or w in STOPWORDS or w in EXCLUDE_TOKENS:
+                continue
+            counter[w] += 1
+    return counter
+
+def synthetic_messages(n: int, seed: int = 0) -> pd.Series:
+    rng = random.Random(seed)
+    extra = ["Don't", "OK!!", "42", "ÜBER", "naïve,", "#tag", "snake_case", "www.example.com"]
+    vocab = WORDS + extra + [f"w{i}" for i in range(2000)]
+    return pd.Series([" ".join(rng.choices(vocab, k=rng.randint(1, 15))) for _ in range(n)])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=1_000_000)
+    args = ap.parse_args()
+    msgs = synthetic_messages(args.messages)
+    timings = {}
+    results = {}
+    for name, fn in (("before", legacy_word_counter), ("after", _word_counter)):
+        t0 = time.perf_counter()
+        results[name] = fn(msgs)
+        timings[name] = time.perf_counter() - t0
+        print(f"{name:6s} {args.messages / timings[name]:,.0f} msgs/s ({timings[name]:.2f}s)")
+    same = results["before"].most_common(50) == results["after"].most_common(50)
+    print(f"speedup={timings['before'] / timings['after']:.2f}x  identical_top50={same}")
+
+if __name__ == "__main__":
+    main()
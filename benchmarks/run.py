@@ -0,0 +1,128 @@
+"""Benchmark suite: time every pipeline stage on synthetic exports.
+
+    python -m benchmarks.run --lines 100000 --out bench.json
+    python -m benchmarks.run --lines 100000 --baseline bench.json --threshold 0.25
+
+Each stage (parse_chat, every analyzer function, export_csv_summaries and
+plot_all) is timed separately and reported with throughput and peak RSS.
+``--workers 2 4`` also times parse_chat with that many processes and records
+the speedup over the serial parse (exports under ``MIN_RANGE_BYTES`` per
+worker use fewer processes).
+With ``--baseline`` the run is compared against a stored result and the
+command exits non-zero if any stage regresses by more than ``--threshold``.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import analyzer
+from src.instrument import PeakRss
+from src.parser import parse_chat
+from src.visuals import plot_all
+from .synth import CLOCKS, FORMATS, generate_export
+
+# every summary function, including the opt-in sentiment ones
+ANALYZER_STAGES = tuple(fn.__name__ for _, fn in analyzer.SUMMARIES.values())
+
+def _measure(fn, units: int) -> tuple[dict, object]:
+    with PeakRss() as rss:
+        t0 = time.perf_counter()
+        out = fn()
+        secs = time.perf_counter() - t0
+    return {"seconds": round(secs, 4), "throughput": round(units / secs, 1) if secs else None,
+            "peak_rss_mb": round(rss.peak / 2**20, 1)}, out
+
+def run_suite(lines: int, fmt: str = "android", clock: str = "24h", workdir: Path | None = None,
+              plots: bool = True, workers: list[int] = ()) -> dict:
+    """Generate one export and time every stage on it."""
+    tmp = tempfile.TemporaryDirectory() if workdir is None else None
+    workdir = Path(tmp.name) if tmp else workdir
+    try:
+        raw = generate_export(workdir / f"synthetic_{fmt}_{clock}_{lines}.txt", lines, fmt, clock=clock)
+        results = {}
+        # parse throughput is in input lines/s; everything downstream in messages/s
+        results["parse_chat"], df = _measure(lambda: parse_chat(raw), lines)
+        rows = len(df)
+        for n in workers:
+            key = f"parse_chat.workers{n}"
+            results[key], _ = _measure(lambda: parse_chat(raw, workers=n), lines)
+            results[key]["speedup"] = round(results["parse_chat"]["seconds"] / results[key]["seconds"], 2)
+        for name in ANALYZER_STAGES:
+            fn = getattr(analyzer, name)
+            results[f"analyzer.{name}"], _ = _measure(lambda: fn(df), rows)
+        results["export_csv_summaries"], _ = _measure(
+            lambda: analyzer.export_csv_summaries(df, workdir / "reports"), rows)
+        if plots:
+            results["plot_all"], _ = _measure(lambda: plot_all(df, workdir / "reports"), rows)
+        return {"lines": lines, "messages": rows, "fmt": fmt, "clock": clock, "stages": results}
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline`` (throughput drop or RSS growth
+    beyond ``threshold``), as human-readable lines."""
+    problems = []
+    base_runs = {(r["fmt"], r["clock"], r["lines"]): r for r in baseline["runs"]}
+    for run in current["runs"]:
+        base = base_runs.get((run["fmt"], run["clock"], run["lines"]))
+        if base is None:
+            continue
+        for stage, cur in run["stages"].items():
+            ref = base["stages"].get(stage)
+            if not ref:
+                continue
+            label = f"{run['fmt']}/{run['clock']}/{run['lines']} {stage}"
+            if ref["throughput"] and cur["throughput"] and \
+                    cur["throughput"] < ref["throughput"] * (1 - threshold):
+                problems.append(f"{label}: throughput {cur['throughput']:,.0f}/s "
+                                f"vs baseline {ref['throughput']:,.0f}/s")
+            if cur["peak_rss_mb"] > ref["peak_rss_mb"] * (1 + threshold):
+                problems.append(f"{label}: peak RSS {cur['peak_rss_mb']} MB "
+                                f"vs baseline {ref['peak_rss_mb']} MB")
+    return problems
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Time every pipeline stage on synthetic exports")
+    ap.add_argument("--lines", type=int, nargs="+", default=[100_000],
+                    help="Export sizes in lines (e.g. 10000 1000000 10000000)")
+    ap.add_argument("--fmt", choices=FORMATS, nargs="+", default=list(FORMATS))
+    ap.add_argument("--clock", choices=CLOCKS, nargs="+", default=["24h"])
+    ap.add_argument("--no-plots", action="store_true", help="Skip plot_all")
+    ap.add_argument("--workers", type=int, nargs="*", default=[],
+                    help="Also time parse_chat with these process counts (e.g. 2 4 8)")
+    ap.add_argument("--out", type=Path, help="Write results JSON here")
+    ap.add_argument("--baseline", type=Path, help="Compare against a stored results JSON")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="Allowed relative regression before failing (default 0.25)")
+    args = ap.parse_args(argv)
+
+    report = {"python": platform.python_version(), "machine": platform.machine(), "runs": []}
+    run_suite(200, plots=False)  # warm-up: imports and one-off regex compilation
+    for lines in args.lines:
+        for fmt in args.fmt:
+            for clock in args.clock:
+                run = run_suite(lines, fmt, clock, plots=not args.no_plots, workers=args.workers)
+                report["runs"].append(run)
+                print(f"\n{fmt}/{clock} {lines:,} lines -> {run['messages']:,} messages")
+                for stage, r in run["stages"].items():
+                    print(f"  {stage:<32s} {r['seconds']:9.3f}s {r['throughput'] or 0:>14,.0f}/s "
+                          f"{r['peak_rss_mb']:8.1f} MB" + (f"  {r['speedup']}x" if "speedup" in r else ""))
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        problems = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
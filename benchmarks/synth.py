@@ -0,0 +1,97 @@
+"""Synthetic WhatsApp exports for benchmarks.
+
+    python -m benchmarks.synth out.txt --lines 1000000 --fmt ios --clock 12h
+"""
+from __future__ import annotations
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+
+SENDERS = ["Alice", "Bob", "Carol", "Dave", "Eve", "Frank", "Grace", "Heidi"]
+WORDS = ("hey ok lol see you tomorrow dinner tonight meeting at the office sounds good "
+         "thanks sure what time call me later project deadline weekend plans").split()
+EMOJI = ["😂", "❤️", "👍🏽", "🔥", "🇮🇳", "👨‍👩‍👧", "🙏"]
+LINKS = ["https://example.com/a", "www.example.org", "https://youtu.be/xyz"]
+SYSTEM = ["{a} added {b}", "{a} left", "{a} changed the group description",
+          "Messages and calls are end-to-end encrypted"]
+MEDIA = {"android": ["<Media omitted>"],
+         "ios": ["‎image omitted", "‎video omitted", "‎sticker omitted"]}
+
+# exports of any size span at most about this long (iOS headers use 2-digit years)
+MAX_SPAN = timedelta(days=3650)
+
+FORMATS = ("android", "ios")
+CLOCKS = ("24h", "12h")
+
+def _header(ts: datetime, fmt: str, clock: str = "24h") -> str:
+    if fmt == "ios":
+        t = (f"{ts:%I:%M:%S %p}".lstrip("0") if clock == "12h" else f"{ts:%H:%M:%S}")
+        return f"[{ts.day}/{ts.month}/{ts:%y}, {t}] "
+    t = f"{ts:%I:%M %p}".lstrip("0").lower() if clock == "12h" else f"{ts:%H:%M}"
+    return f"{ts.day}/{ts.month}/{ts:%Y}, {t} - "
+
+def iter_export_lines(n_lines: int, fmt: str = "android", multiline: float = 0.3,
+                      seed: int = 0, clock: str = "24h", media: float = 0.03,
+                      emoji: float = 0.15, system: float = 0.005, links: float = 0.01):
+    """Yield ``n_lines`` export lines.
+
+    ``multiline`` is the share of continuation lines; ``media``, ``emoji``,
+    ``system`` and ``links`` are the shares of message headers that carry a
+    media marker, emoji, a system notice or a URL.
+    """
+    if fmt not in FORMATS or clock not in CLOCKS:
+        raise ValueError(f"fmt must be one of {FORMATS} and clock one of {CLOCKS}")
+    rng = random.Random(seed)
+    ts = datetime(2020, 1, 1, 8, 0)
+    # up to 15 min between messages, less when that would run past MAX_SPAN
+    headers = max(1.0, n_lines * (1 - multiline))
+    hi = max(1, min(900, int(2 * MAX_SPAN.total_seconds() / headers)))
+    lo = min(5, hi)
+    for _ in range(n_lines):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(2, 12)))
+        if rng.random() < multiline:
+            yield text
+            continue
+        ts += timedelta(seconds=rng.randint(lo, hi))
+        head = _header(ts, fmt, clock)
+        r = rng.random()
+        if r < system:
+            a, b = rng.sample(SENDERS, 2)
+            yield head + rng.choice(SYSTEM).format(a=a, b=b)
+            continue
+        if r < system + media:
+            text = rng.choice(MEDIA[fmt])
+        else:
+            if rng.random() < emoji:
+                text += " " + "".join(rng.choices(EMOJI, k=rng.randint(1, 4)))
+            if rng.random() < links:
+                text += " " + rng.choice(LINKS)
+        yield f"{head}{rng.choice(SENDERS)}: {text}"
+
+def generate_export(path: Path, n_lines: int, fmt: str = "android", multiline: float = 0.3,
+                    seed: int = 0, **mix) -> Path:
+    """Write a synthetic export; ``mix`` is passed through to :func:`iter_export_lines`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        for line in iter_export_lines(n_lines, fmt, multiline, seed, **mix):
+            fh.write(line + "\n")
+    return path
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic WhatsApp export")
+    ap.add_argument("output")
+    ap.add_argument("--lines", type=int, default=100_000)
+    ap.add_argument("--fmt", choices=FORMATS, default="android")
+    ap.add_argument("--clock", choices=CLOCKS, default="24h")
+    ap.add_argument("--multiline", type=float, default=0.3)
+    ap.add_argument("--media", type=float, default=0.03)
+    ap.add_argument("--emoji", type=float, default=0.15)
+    ap.add_argument("--system", type=float, default=0.005)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    generate_export(Path(args.output), args.lines, args.fmt, args.multiline, args.seed,
+                    clock=args.clock, media=args.media, emoji=args.emoji, system=args.system)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from collections import Counter
+from dataclasses import dataclass, field
+import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from .utils import extract_urls, ensure_dir
+from . import instrument
+from .utils import DTYPES, ensure_dir, emoji_pattern
 
 # Basic English stopwords + a few noisy tokens we never want
 STOPWORDS = set((
@@ -15,18 +19,28 @@ STOPWORDS = set((
 # extra tokens to exclude even if not in STOPWORDS
 EXCLUDE_TOKENS = {"media", "omitted"}
 
+WEEKDAY_ABBR = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+
 def _clean_messages(df: pd.DataFrame) -> pd.Series:
     """Return only real user text (no system, no media)."""
     mask = (~df["is_system"].fillna(False)) & (~df["is_media"].fillna(False)) & (df["message"].notna())
     return df.loc[mask, "message"]
 
+def uses(*columns: str):
+    """Declare the frame columns a summary reads, so loaders can project to them."""
+    def wrap(fn):
+        fn.columns = columns
+        return fn
+    return wrap
+
+@uses("is_system", "sender", "is_media", "emoji_count", "link_count", "timestamp")
 def basic_stats(df: pd.DataFrame) -> dict:
     text_df = df[(~df["is_system"].fillna(False))]
     total_msgs = len(text_df)
     participants = sorted([s for s in text_df["sender"].dropna().unique()])
     media_msgs = int(text_df["is_media"].sum())
     emojis = int(text_df["emoji_count"].sum())
-    links = sum(len(extract_urls(t)) for t in text_df["message"].dropna())
+    links = int(text_df["link_count"].sum())
     return {
         "total_messages": total_msgs,
         "participants": participants,
@@ -37,55 +51,632 @@ def basic_stats(df: pd.DataFrame) -> dict:
         "date_max": str(df["timestamp"].max()) if "timestamp" in df else None,
     }
 
+# count-only summaries count rows; they never read the message text
+
+@uses("is_system", "sender")
 def messages_per_sender(df: pd.DataFrame) -> pd.DataFrame:
-    d = df[~df["is_system"].fillna(False) & df["sender"].notna()].groupby("sender")["message"] \
-        .count().sort_values(ascending=False).reset_index(name="message_count")
+    d = df[~df["is_system"].fillna(False) & df["sender"].notna()].groupby("sender", observed=True) \
+        .size().sort_values(ascending=False).reset_index(name="message_count")
     return d
 
+@uses("date")
 def daily_timeline(df: pd.DataFrame) -> pd.DataFrame:
-    d = df[df["timestamp"].notna()].groupby("date")["message"].count().reset_index(name="messages")
+    d = df[df["date"].notna()].groupby("date").size().reset_index(name="messages")
     return d
 
+@uses("hour")
 def hourly_timeline(df: pd.DataFrame) -> pd.DataFrame:
-    d = df[df["hour"].notna()].groupby("hour")["message"].count().reindex(range(24), fill_value=0) \
+    d = df[df["hour"].notna()].groupby("hour").size().reindex(range(24), fill_value=0) \
         .reset_index(name="messages")
     return d
 
+@uses("date", "hour")
 def weekday_hour_heatmap(df: pd.DataFrame) -> pd.DataFrame:
-    sub = df[df["timestamp"].notna()].copy()
-    sub["weekday_num"] = pd.to_datetime(sub["date"]).dt.dayofweek  # Mon=0
-    mat = sub.pivot_table(index="weekday_num", columns="hour", values="message", aggfunc="count", fill_value=0)
+    sub = df[df["date"].notna()]
+    mat = pd.crosstab(pd.to_datetime(sub["date"]).dt.dayofweek, sub["hour"])  # Mon=0
     mat = mat.reindex(index=range(7), fill_value=0).reindex(columns=range(24), fill_value=0)
-    mat.index = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+    mat.index = WEEKDAY_ABBR
     return mat
 
-def top_words(df: pd.DataFrame, top_n: int = 50) -> pd.DataFrame:
-    """Return most common words from real user text (no media/system)."""
-    counter = Counter()
-    for t in _clean_messages(df):
-        for w in t.lower().split():
-            w = "".join(ch for ch in w if ch.isalnum())  # strip punctuation
-            if not w or w.isdigit() or w in STOPWORDS or w in EXCLUDE_TOKENS:
-                continue
-            counter[w] += 1
-    items = counter.most_common(top_n)
-    return pd.DataFrame(items, columns=["word","count"])
-
-def emoji_freq(df: pd.DataFrame, top_n: int = 30) -> pd.DataFrame:
-    from collections import Counter as CC
-    counter = CC()
-    for s in df["emoji_list"].dropna():
-        for e in list(s):
-            counter[e] += 1
-    items = counter.most_common(top_n)
-    return pd.DataFrame(items, columns=["emoji","count"])
+# everything that is neither alphanumeric nor whitespace is stripped from tokens
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_DROP_TOKENS = frozenset(STOPWORDS | EXCLUDE_TOKENS)
+_TOKEN_CHUNK = 100_000
+
+def _word_counter(messages: pd.Series, into=None):
+    """Same counts as lowercasing, splitting and stripping non-alphanumerics per token.
+
+    Messages are tokenized a chunk at a time as one joined string (a single
+    regex pass plus a C-level Counter update); stopwords and numbers are then
+    dropped from the chunk's distinct keys only. Keys keep first-appearance
+    order, so ``most_common`` breaks ties like the per-token loop did.
+
+    Chunk counts are merged into ``into`` (a ``Counter`` by default, or a
+    :class:`src.sketch.SpaceSaving` to bound memory).
+    """
+    acc = Counter() if into is None else into
+    messages = messages.dropna()
+    for i in range(0, len(messages), _TOKEN_CHUNK):
+        text = " ".join(messages.iloc[i:i + _TOKEN_CHUNK].tolist()).lower()
+        chunk = Counter(_NON_WORD.sub("", text).split())
+        for w in [w for w in chunk if w in _DROP_TOKENS or w.isdigit()]:
+            del chunk[w]
+        acc.update(chunk)
+    return acc
+
+def _emoji_counter(emoji_lists: pd.Series, into=None):
+    # emoji_list is a concatenated string; re-split it into whole emoji sequences
+    acc = Counter() if into is None else into
+    found = emoji_lists.dropna()
+    found = found[found.str.len() > 0]
+    if found.empty:  # skip loading the emoji table for emoji-free chats
+        return acc
+    acc.update(Counter(found.str.findall(emoji_pattern()).explode().dropna()))
+    return acc
+
+def _sketch(approx: int | None):
+    """Accumulator for top-k counts: exact ``None``, or a SpaceSaving of ``approx`` items."""
+    if approx is None:
+        return None
+    from .sketch import SpaceSaving
+    return SpaceSaving(approx)
+
+def _top_frame(counts, top_n: int, label: str) -> pd.DataFrame:
+    out = pd.DataFrame(counts.most_common(top_n), columns=[label, "count"])
+    if hasattr(counts, "errors"):
+        # approximate: the true count lies in [count - error, count]
+        out["error"] = [counts.errors[x] for x in out[label]]
+    return out
+
+@uses("is_system", "is_media", "message")
+def top_words(df: pd.DataFrame, top_n: int = 50, approx: int | None = None) -> pd.DataFrame:
+    """Return most common words from real user text (no media/system).
+
+    ``approx`` tracks at most that many distinct words (see :mod:`src.sketch`)
+    and adds an ``error`` column.
+    """
+    return _top_frame(_word_counter(_clean_messages(df), _sketch(approx)), top_n, "word")
+
+@uses("emoji_list")
+def emoji_freq(df: pd.DataFrame, top_n: int = 30, approx: int | None = None) -> pd.DataFrame:
+    return _top_frame(_emoji_counter(df["emoji_list"], _sketch(approx)), top_n, "emoji")
+
+def _domain_counter(domains: pd.Series) -> Counter:
+    # link_domains holds the space-separated domains of each message's links
+    found = domains.dropna()
+    found = found[found.str.len() > 0]
+    return Counter(found.str.split().explode().value_counts().to_dict()) if len(found) else Counter()
+
+@uses("is_system", "link_domains")
+def top_domains(df: pd.DataFrame, top_n: int = 20) -> pd.DataFrame:
+    """Most linked domains in user messages."""
+    user = ~df["is_system"].fillna(False)
+    return _top_frame(_domain_counter(df.loc[user, "link_domains"]), top_n, "domain")
+
+# A user message is a reply when its sender differs from the previous user
+# message's and it arrives within REPLY_WINDOW of it; a silence longer than
+# SESSION_GAP starts a new conversation session (a reply may open one). Reply
+# delays are exact seconds; delays past the gap are rare enough (at most one
+# per session) that the per-sender histograms stay small. Everything is one
+# sort plus diffs over the frame.
+SESSION_GAP = pd.Timedelta(minutes=30)
+REPLY_WINDOW = pd.Timedelta(days=1)
+
+def _user_stream(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """UTC and local wall-clock nanoseconds and senders of the timed user
+    messages, in timestamp order."""
+    keep = ~df["is_system"].fillna(False) & df["sender"].notna() & df["timestamp"].notna()
+    ts = df.loc[keep, "timestamp"]
+    local = ts.dt.tz_localize(None) if ts.dt.tz is not None else ts
+    ns = (ts.dt.tz_convert("UTC") if ts.dt.tz is not None else ts).to_numpy(dtype="datetime64[ns]").view("int64")
+    order = np.argsort(ns, kind="stable")
+    return (ns[order], local.to_numpy(dtype="datetime64[ns]").view("int64")[order],
+            df.loc[keep, "sender"].astype(object).to_numpy()[order])
+
+def _reply_scan(ns: np.ndarray, senders: np.ndarray, gap: pd.Timedelta = SESSION_GAP,
+                window: pd.Timedelta = REPLY_WINDOW):
+    """Session-start flags and reply mask of message pairs ``(i, i + 1)``, and
+    reply delays in seconds."""
+    d = np.diff(ns)
+    new = d > gap.value
+    reply = (d <= window.value) & (senders[1:] != senders[:-1])
+    return new, reply, d[reply] // 1_000_000_000
+
+def _session_bounds(ns: np.ndarray, local: np.ndarray, new: np.ndarray) -> list[tuple]:
+    """``(start, end, duration, messages)`` of each session; start and end are
+    local wall-clock ns, the duration is measured in UTC (exact across DST)."""
+    if not len(ns):
+        return []
+    starts = np.flatnonzero(np.r_[True, new])
+    last = np.r_[starts[1:], len(ns)] - 1
+    return list(zip(local[starts].tolist(), local[last].tolist(), (ns[last] - ns[starts]).tolist(),
+                    (last - starts + 1).tolist()))
+
+def _sort_replies(out: pd.DataFrame) -> pd.DataFrame:
+    return out.sort_values(["replies", "sender"], ascending=[False, True], ignore_index=True)
+
+def _square(mat: pd.DataFrame, names: list) -> pd.DataFrame:
+    mat = mat.reindex(index=names, columns=names, fill_value=0)
+    mat.index.name, mat.columns.name = "from", "to"
+    return mat
+
+def _session_frame(bounds: list[tuple]) -> pd.DataFrame:
+    b = np.array(bounds, dtype="int64").reshape(-1, 4)
+    return pd.DataFrame({"session": np.arange(1, len(b) + 1),
+                         "start": pd.to_datetime(b[:, 0]), "end": pd.to_datetime(b[:, 1]),
+                         "duration_minutes": b[:, 2] / 60e9, "messages": b[:, 3]})
+
+@uses("is_system", "sender", "timestamp")
+def reply_times(df: pd.DataFrame, window: pd.Timedelta = REPLY_WINDOW) -> pd.DataFrame:
+    """Per sender: number of replies and median / 90th percentile reply time in seconds."""
+    ns, _, senders = _user_stream(df)
+    _, reply, secs = _reply_scan(ns, senders, window=window)
+    g = pd.Series(secs, index=pd.Index(senders[1:][reply], name="sender"), dtype="int64").groupby(level=0)
+    out = pd.DataFrame({"replies": g.size(), "median_seconds": g.median(), "p90_seconds": g.quantile(0.9)})
+    return _sort_replies(out.reset_index())
+
+@uses("is_system", "sender", "timestamp")
+def reply_matrix(df: pd.DataFrame, window: pd.Timedelta = REPLY_WINDOW) -> pd.DataFrame:
+    """Replies from the row sender's message by the column sender."""
+    ns, _, senders = _user_stream(df)
+    _, reply, _ = _reply_scan(ns, senders, window=window)
+    frm, to = senders[:-1][reply], senders[1:][reply]
+    mat = pd.crosstab(pd.Series(frm, dtype=object), pd.Series(to, dtype=object))
+    return _square(mat, sorted(set(frm) | set(to)))
+
+@uses("is_system", "sender", "timestamp")
+def sessions(df: pd.DataFrame, gap: pd.Timedelta = SESSION_GAP) -> pd.DataFrame:
+    """Conversation sessions separated by more than ``gap`` without user messages."""
+    ns, local, senders = _user_stream(df)
+    new, _, _ = _reply_scan(ns, senders, gap)
+    return _session_frame(_session_bounds(ns, local, new))
+
+def _hist_quantile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+    """Linearly interpolated quantile (as pandas computes it) of ``values`` repeated ``counts`` times."""
+    cum = np.cumsum(counts)
+    pos = q * (cum[-1] - 1)
+    lo, hi = values[np.searchsorted(cum, [np.floor(pos), np.ceil(pos)], "right")]
+    return float(lo + (hi - lo) * (pos - np.floor(pos)))
+
+_CONVERSATION = {"reply_times", "reply_matrix", "sessions"}
+
+# Sentiment is opt-in (it needs vaderSentiment and scores every distinct text
+# once); aggregates keep per-key sums so they merge like the other counters.
+SENTIMENT_SUMMARIES = ("sentiment_daily", "sentiment_senders")
+_SENTIMENT_STATS = ("messages", "compound", "positive", "negative")
+
+def _sentiment_counts(df: pd.DataFrame, by: pd.Series) -> Counter:
+    """``(key, stat) -> value`` of the scored clean messages grouped by ``by``."""
+    from .sentiment import NEGATIVE, POSITIVE, score_messages
+    scores = score_messages(_clean_messages(df))
+    stats = pd.DataFrame({"messages": 1, "compound": scores.astype("float64"),
+                          "positive": scores >= POSITIVE, "negative": scores <= NEGATIVE})
+    totals = stats.groupby(by.loc[scores.index], observed=True).sum()
+    return Counter({(k, stat): (float(v) if stat == "compound" else int(v))
+                    for (k, stat), v in totals.stack().items()})
+
+def _sentiment_frame(counts: Counter, label: str) -> pd.DataFrame:
+    t = pd.Series(counts, dtype="float64").unstack() if counts else \
+        pd.DataFrame(columns=list(_SENTIMENT_STATS), dtype="float64")
+    n = t["messages"]
+    return pd.DataFrame({label: t.index.astype(object), "messages": n.astype("int64").to_numpy(),
+                         "mean_compound": (t["compound"] / n).to_numpy(),
+                         "positive_share": (t["positive"] / n).to_numpy(),
+                         "negative_share": (t["negative"] / n).to_numpy()})
+
+def _day_keys(df: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+
+def _daily_sentiment(counts: Counter) -> pd.DataFrame:
+    out = _sentiment_frame(counts, "date").sort_values("date", ignore_index=True)
+    out["date"] = pd.to_datetime(out["date"])
+    return out
+
+def _sender_sentiment(counts: Counter) -> pd.DataFrame:
+    return _sentiment_frame(counts, "sender").sort_values(["messages", "sender"], ascending=[False, True],
+                                                          ignore_index=True)
+
+@uses("is_system", "is_media", "message", "date")
+def sentiment_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """Per day: scored messages, mean VADER compound score and positive/negative shares."""
+    return _daily_sentiment(_sentiment_counts(df, _day_keys(df)))
+
+@uses("is_system", "is_media", "message", "sender")
+def sentiment_senders(df: pd.DataFrame) -> pd.DataFrame:
+    """Per sender: scored messages, mean VADER compound score and positive/negative shares."""
+    return _sender_sentiment(_sentiment_counts(df, df["sender"].astype(object)))
+
+_COUNTERS = ("senders", "daily", "hourly", "heatmap", "words", "emojis", "domains",
+             "reply_delays", "replies", "sentiment_daily", "sentiment_senders")
+
+def _copy_counts(counts):
+    if hasattr(counts, "capacity"):
+        return _sketch(counts.capacity).update(counts)
+    return Counter(counts)
+
+def _counts_to_dict(counts) -> dict:
+    if hasattr(counts, "capacity"):
+        return {"space_saving": counts.to_dict()}
+    return dict(counts)
+
+def _counts_from_dict(d: dict):
+    if set(d) == {"space_saving"} and isinstance(d["space_saving"], dict):
+        from .sketch import SpaceSaving
+        return SpaceSaving.from_dict(d["space_saving"])
+    return Counter(d)
+
+@dataclass
+class ChatAggregates:
+    """Mergeable partial aggregates behind every CSV summary.
+
+    Aggregates of consecutive slices of a chat can be merged in file order
+    and produce exactly the summaries of the whole chat, which is what
+    incremental runs rely on.
+    """
+    total_messages: int = 0
+    participants: set = field(default_factory=set)
+    media_messages: int = 0
+    total_emojis: int = 0
+    links_shared: int = 0
+    date_min: pd.Timestamp | None = None
+    date_max: pd.Timestamp | None = None
+    senders: Counter = field(default_factory=Counter)
+    daily: Counter = field(default_factory=Counter)      # "YYYY-MM-DD" -> messages
+    hourly: Counter = field(default_factory=Counter)     # hour -> messages
+    heatmap: Counter = field(default_factory=Counter)    # (weekday_num, hour) -> messages
+    words: Counter = field(default_factory=Counter)
+    emojis: Counter = field(default_factory=Counter)
+    domains: Counter = field(default_factory=Counter)
+    reply_delays: Counter = field(default_factory=Counter)  # (sender, seconds) -> replies
+    replies: Counter = field(default_factory=Counter)       # (from, to) -> replies
+    sessions: list = field(default_factory=list)            # see _session_bounds
+    first_msg: tuple | None = None  # (UTC ns, sender) of the earliest user message,
+    last_msg: tuple | None = None   # and of the latest; joins replies/sessions across merges
+    sentiment_daily: Counter = field(default_factory=Counter)    # (day, stat) -> total
+    sentiment_senders: Counter = field(default_factory=Counter)  # (sender, stat) -> total
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, summaries: list[str] | None = None,
+                   approx: int | None = None) -> "ChatAggregates":
+        """Aggregate a parsed frame in one pass over shared masks (no per-summary copies).
+
+        With ``summaries`` only the parts behind those summaries are computed,
+        and ``df`` only needs the columns from :func:`columns_for`. ``approx``
+        bounds the word and emoji counts to that many items each.
+        """
+        if df.empty:
+            return cls()
+        parts = set(DEFAULT_SUMMARIES if summaries is None else _check_summaries(summaries))
+        with instrument.stage("analyze.counts", len(df)):
+            agg = cls._counts(df, parts)
+        if "top_words" in parts:
+            clean = ~df["is_system"].fillna(False) & ~df["is_media"].fillna(False) & df["message"].notna()
+            with instrument.stage("analyze.words", int(clean.sum())):
+                agg.words = _word_counter(df.loc[clean, "message"], _sketch(approx))
+        if "emoji_freq" in parts:
+            with instrument.stage("analyze.emojis", len(df)):
+                agg.emojis = _emoji_counter(df["emoji_list"], _sketch(approx))
+        if parts & _CONVERSATION:
+            with instrument.stage("analyze.replies", len(df)):
+                agg._conversation(df)
+        if "sentiment_daily" in parts:
+            with instrument.stage("analyze.sentiment", len(df)):
+                agg.sentiment_daily = _sentiment_counts(df, _day_keys(df))
+        if "sentiment_senders" in parts:
+            # distinct texts are scored once, so a second pass only hits the score cache
+            with instrument.stage("analyze.sentiment", len(df)):
+                agg.sentiment_senders = _sentiment_counts(df, df["sender"].astype(object))
+        return agg
+
+    def _conversation(self, df: pd.DataFrame):
+        ns, local, senders = _user_stream(df)
+        if not len(ns):
+            return
+        new, reply, secs = _reply_scan(ns, senders)
+        to = senders[1:][reply]
+        self.reply_delays = Counter(zip(to.tolist(), secs.tolist()))
+        self.replies = Counter(zip(senders[:-1][reply].tolist(), to.tolist()))
+        self.sessions = _session_bounds(ns, local, new)
+        self.first_msg, self.last_msg = (int(ns[0]), senders[0]), (int(ns[-1]), senders[-1])
+
+    @classmethod
+    def _counts(cls, df: pd.DataFrame, parts: set) -> "ChatAggregates":
+        agg = cls()
+        if parts & {"overall", "messages_per_sender", "top_domains"}:
+            user = ~df["is_system"].fillna(False)
+        if parts & {"overall", "messages_per_sender"}:
+            senders = df.loc[user, "sender"].dropna()
+            agg.senders = Counter(senders.astype(object).value_counts().to_dict())
+        if "overall" in parts:
+            agg.total_messages = int(user.sum())
+            agg.participants = set(senders.unique())
+            agg.media_messages = int(df.loc[user, "is_media"].sum())
+            agg.total_emojis = int(df.loc[user, "emoji_count"].sum())
+            agg.links_shared = int(df.loc[user, "link_count"].sum())
+            ts = df["timestamp"].dropna()
+            if len(ts):
+                agg.date_min, agg.date_max = ts.min(), ts.max()
+        if "top_domains" in parts:
+            agg.domains = _domain_counter(df.loc[user, "link_domains"])
+        by_date = parts & {"daily_timeline", "weekday_hour_heatmap"}
+        by_hour = parts & {"hourly_timeline", "weekday_hour_heatmap"}
+        if by_date or by_hour:
+            # one count grid over (date, hour), or whichever of the two is needed,
+            # feeds the daily, hourly and heatmap summaries
+            keys = ["date"] * bool(by_date) + ["hour"] * bool(by_hour)
+            timed = df[keys].notna().all(axis=1)
+            grid = pd.DataFrame({k: pd.to_datetime(df.loc[timed, k]) if k == "date"
+                                 else df.loc[timed, k].astype("int64") for k in keys}).value_counts()
+            if by_date:
+                dates = grid.index.get_level_values("date")
+                agg.daily = Counter({d: int(n) for d, n in grid.groupby(dates.strftime("%Y-%m-%d")).sum().items()})
+            if by_hour:
+                hours = grid.index.get_level_values("hour")
+                agg.hourly = Counter({int(h): int(n) for h, n in grid.groupby(hours).sum().items()})
+            if by_date and by_hour:
+                agg.heatmap = Counter({(int(w), int(h)): int(n)
+                                       for (w, h), n in grid.groupby([dates.dayofweek, hours]).sum().items()})
+        return agg
+
+    def merge(self, other: "ChatAggregates") -> "ChatAggregates":
+        """Combine with the aggregates of the slice that follows this one."""
+        out = ChatAggregates(participants=set(self.participants), date_min=self.date_min,
+                             date_max=self.date_max,
+                             **{name: _copy_counts(getattr(self, name)) for name in _COUNTERS})
+        out.total_messages, out.media_messages = self.total_messages, self.media_messages
+        out.total_emojis, out.links_shared = self.total_emojis, self.links_shared
+        out.sessions, out.first_msg, out.last_msg = list(self.sessions), self.first_msg, self.last_msg
+        return out.update(other)
+
+    def update(self, other: "ChatAggregates") -> "ChatAggregates":
+        """In-place :meth:`merge` (no copies of the large counters); returns ``self``."""
+        def _pick(a, b, fn):
+            return b if a is None else a if b is None else fn(a, b)
+        self.total_messages += other.total_messages
+        self.participants |= other.participants
+        self.media_messages += other.media_messages
+        self.total_emojis += other.total_emojis
+        self.links_shared += other.links_shared
+        self.date_min = _pick(self.date_min, other.date_min, min)
+        self.date_max = _pick(self.date_max, other.date_max, max)
+        for name in _COUNTERS:
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if hasattr(theirs, "capacity") and not hasattr(mine, "capacity"):
+                # exact counts merged with a sketch become a sketch
+                mine = _sketch(theirs.capacity).update(mine)
+                setattr(self, name, mine)
+            mine.update(theirs)
+        self._join(other)
+        return self
+
+    def _join(self, other: "ChatAggregates"):
+        """Append ``other``'s sessions; the message pair across the boundary may
+        be a reply and continue the last session."""
+        theirs = other.sessions
+        if self.last_msg and other.first_msg:
+            (t0, s0), (t1, s1) = self.last_msg, other.first_msg
+            if t1 - t0 <= REPLY_WINDOW.value and s0 != s1:
+                self.replies[(s0, s1)] += 1
+                self.reply_delays[(s1, (t1 - t0) // 1_000_000_000)] += 1
+            if t1 - t0 <= SESSION_GAP.value:
+                start, _, dur, n = self.sessions.pop()
+                _, end, their_dur, their_n = theirs[0]
+                self.sessions.append((start, end, dur + (t1 - t0) + their_dur, n + their_n))
+                theirs = theirs[1:]
+        self.sessions.extend(theirs)
+        self.first_msg = self.first_msg or other.first_msg
+        self.last_msg = other.last_msg or self.last_msg
+
+    def to_dict(self) -> dict:
+        """JSON-safe representation (see :meth:`from_dict`)."""
+        return {
+            "total_messages": self.total_messages,
+            "participants": sorted(self.participants),
+            "media_messages": self.media_messages,
+            "total_emojis": self.total_emojis,
+            "links_shared": self.links_shared,
+            "date_min": self.date_min.isoformat() if self.date_min is not None else None,
+            "date_max": self.date_max.isoformat() if self.date_max is not None else None,
+            "senders": dict(self.senders),
+            "daily": dict(self.daily),
+            "hourly": {str(k): v for k, v in self.hourly.items()},
+            "heatmap": {f"{w},{h}": v for (w, h), v in self.heatmap.items()},
+            "words": _counts_to_dict(self.words),
+            "emojis": _counts_to_dict(self.emojis),
+            "domains": dict(self.domains),
+            "reply_delays": [[s, secs, n] for (s, secs), n in self.reply_delays.items()],
+            "replies": [[a, b, n] for (a, b), n in self.replies.items()],
+            "sessions": [list(x) for x in self.sessions],
+            "first_msg": list(self.first_msg) if self.first_msg else None,
+            "last_msg": list(self.last_msg) if self.last_msg else None,
+            "sentiment_daily": [[k, stat, v] for (k, stat), v in self.sentiment_daily.items()],
+            "sentiment_senders": [[k, stat, v] for (k, stat), v in self.sentiment_senders.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ChatAggregates":
+        return cls(
+            total_messages=d["total_messages"],
+            participants=set(d["participants"]),
+            media_messages=d["media_messages"],
+            total_emojis=d["total_emojis"],
+            links_shared=d["links_shared"],
+            date_min=pd.Timestamp(d["date_min"]) if d["date_min"] else None,
+            date_max=pd.Timestamp(d["date_max"]) if d["date_max"] else None,
+            senders=Counter(d["senders"]),
+            daily=Counter(d["daily"]),
+            hourly=Counter({int(k): v for k, v in d["hourly"].items()}),
+            heatmap=Counter({tuple(map(int, k.split(","))): v for k, v in d["heatmap"].items()}),
+            words=_counts_from_dict(d["words"]),
+            emojis=_counts_from_dict(d["emojis"]),
+            domains=Counter(d["domains"]),
+            reply_delays=Counter({(s, secs): n for s, secs, n in d["reply_delays"]}),
+            replies=Counter({(a, b): n for a, b, n in d["replies"]}),
+            sessions=[tuple(x) for x in d["sessions"]],
+            first_msg=tuple(d["first_msg"]) if d["first_msg"] else None,
+            last_msg=tuple(d["last_msg"]) if d["last_msg"] else None,
+            sentiment_daily=Counter({(k, stat): v for k, stat, v in d["sentiment_daily"]}),
+            sentiment_senders=Counter({(k, stat): v for k, stat, v in d["sentiment_senders"]}),
+        )
+
+class AnalysisResult:
+    """Every summary of a chat, derived from one :class:`ChatAggregates` and cached.
+
+    The CLI, :func:`src.visuals.plot_all` and the dashboard all read from the
+    same object instead of re-scanning the frame per summary.
+    """
+
+    def __init__(self, aggregates: ChatAggregates):
+        self.aggregates = aggregates
+        self._cache: dict = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, summaries: list[str] | None = None,
+                   approx: int | None = None) -> "AnalysisResult":
+        return cls(ChatAggregates.from_frame(df, summaries, approx))
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def basic_stats(self) -> dict:
+        a = self.aggregates
+        return {
+            "total_messages": a.total_messages,
+            "participants": sorted(a.participants),
+            "media_messages": a.media_messages,
+            "total_emojis": a.total_emojis,
+            "links_shared": a.links_shared,
+            "date_min": str(a.date_min if a.date_min is not None else pd.NaT),
+            "date_max": str(a.date_max if a.date_max is not None else pd.NaT),
+        }
+
+    def messages_per_sender(self) -> pd.DataFrame:
+        def build():
+            s = pd.Series(self.aggregates.senders, dtype="int64").sort_index().rename_axis("sender")
+            return s.sort_values(ascending=False).reset_index(name="message_count")
+        return self._cached("senders", build)
+
+    def daily_timeline(self) -> pd.DataFrame:
+        def build():
+            daily = self.aggregates.daily
+            days = sorted(daily)
+            return pd.DataFrame({"date": pd.to_datetime(pd.Series(days, dtype=object)),
+                                 "messages": [daily[d] for d in days]})
+        return self._cached("daily", build)
+
+    def hourly_timeline(self) -> pd.DataFrame:
+        hourly = self.aggregates.hourly
+        return self._cached("hourly", lambda: pd.DataFrame(
+            {"hour": range(24), "messages": [hourly.get(h, 0) for h in range(24)]}))
+
+    def weekday_hour_heatmap(self) -> pd.DataFrame:
+        heat = self.aggregates.heatmap
+        return self._cached("heatmap", lambda: pd.DataFrame(
+            [[heat.get((w, h), 0) for h in range(24)] for w in range(7)],
+            index=WEEKDAY_ABBR, columns=range(24)))
+
+    def top_words(self, top_n: int = 50) -> pd.DataFrame:
+        return self._cached(("words", top_n), lambda: _top_frame(self.aggregates.words, top_n, "word"))
+
+    def emoji_freq(self, top_n: int = 30) -> pd.DataFrame:
+        return self._cached(("emojis", top_n), lambda: _top_frame(self.aggregates.emojis, top_n, "emoji"))
+
+    def top_domains(self, top_n: int = 20) -> pd.DataFrame:
+        return self._cached(("domains", top_n), lambda: _top_frame(self.aggregates.domains, top_n, "domain"))
+
+    def reply_times(self) -> pd.DataFrame:
+        def build():
+            by_sender: dict = {}
+            for (sender, secs), n in self.aggregates.reply_delays.items():
+                by_sender.setdefault(sender, []).append((secs, n))
+            rows = []
+            for sender, hist in by_sender.items():
+                values, counts = np.array(sorted(hist), dtype="int64").T
+                rows.append((sender, int(counts.sum()), _hist_quantile(values, counts, 0.5),
+                             _hist_quantile(values, counts, 0.9)))
+            return _sort_replies(pd.DataFrame(rows, columns=["sender", "replies", "median_seconds", "p90_seconds"]))
+        return self._cached("reply_times", build)
+
+    def reply_matrix(self) -> pd.DataFrame:
+        def build():
+            replies = self.aggregates.replies
+            names = sorted({x for pair in replies for x in pair})
+            return _square(pd.DataFrame([[replies.get((a, b), 0) for b in names] for a in names],
+                                        index=names, columns=names), names)
+        return self._cached("reply_matrix", build)
+
+    def sessions(self) -> pd.DataFrame:
+        a = self.aggregates
+        return self._cached("sessions", lambda: _session_frame(a.sessions))
+
+    def sentiment_daily(self) -> pd.DataFrame:
+        return self._cached("sentiment_daily", lambda: _daily_sentiment(self.aggregates.sentiment_daily))
+
+    def sentiment_senders(self) -> pd.DataFrame:
+        return self._cached("sentiment_senders", lambda: _sender_sentiment(self.aggregates.sentiment_senders))
+
+    def summary(self, name: str) -> pd.DataFrame:
+        """The frame written to the CSV of summary ``name`` (a key of :data:`SUMMARIES`)."""
+        if name == "overall":
+            return pd.DataFrame([self.basic_stats()])
+        return getattr(self, name)()
+
+    def export(self, outdir: Path, summaries: list[str] | None = None):
+        """Write the CSV summaries (:data:`DEFAULT_SUMMARIES` by default)."""
+        names = DEFAULT_SUMMARIES if summaries is None else _check_summaries(summaries)
+        with instrument.stage("analyze.export"):
+            ensure_dir(outdir)
+            for name in names:
+                self.summary(name).to_csv(outdir / SUMMARIES[name][0], index=name in _INDEXED)
+
+def analyze(df: pd.DataFrame, summaries: list[str] | None = None, rows=None,
+            approx: int | None = None) -> AnalysisResult:
+    """Aggregate ``df`` for ``summaries`` (:data:`DEFAULT_SUMMARIES` by default).
+
+    ``rows`` restricts the analysis to those row numbers, e.g. a
+    :meth:`src.index.ChatIndex.rows` query, without masking the whole frame.
+    ``approx`` switches top words/emoji to bounded-memory approximate counts.
+    """
+    if rows is not None:
+        df = df.take(rows)
+    return AnalysisResult.from_frame(df, summaries, approx)
+
+# summary name -> (CSV file, frame-level function declaring the columns it needs)
+SUMMARIES = {
+    "overall": ("summary_overall.csv", basic_stats),
+    "messages_per_sender": ("summary_messages_per_sender.csv", messages_per_sender),
+    "daily_timeline": ("summary_daily_timeline.csv", daily_timeline),
+    "hourly_timeline": ("summary_hourly_timeline.csv", hourly_timeline),
+    "top_words": ("summary_top_words.csv", top_words),
+    "emoji_freq": ("summary_emoji_freq.csv", emoji_freq),
+    "weekday_hour_heatmap": ("summary_weekday_hour_heatmap.csv", weekday_hour_heatmap),
+    "top_domains": ("summary_top_domains.csv", top_domains),
+    "reply_times": ("summary_reply_times.csv", reply_times),
+    "reply_matrix": ("summary_reply_matrix.csv", reply_matrix),
+    "sessions": ("summary_sessions.csv", sessions),
+    "sentiment_daily": ("summary_sentiment_daily.csv", sentiment_daily),
+    "sentiment_senders": ("summary_sentiment_senders.csv", sentiment_senders),
+}
+
+# what analyze/export compute when no summaries are named
+DEFAULT_SUMMARIES = [n for n in SUMMARIES if n not in SENTIMENT_SUMMARIES]
+
+# matrices keep their row labels as the first CSV column
+_INDEXED = {"weekday_hour_heatmap", "reply_matrix"}
+
+def _check_summaries(names: list[str]) -> list[str]:
+    unknown = [n for n in names if n not in SUMMARIES]
+    if unknown:
+        raise ValueError(f"unknown summary(s): {', '.join(unknown)}; choose from {', '.join(SUMMARIES)}")
+    return list(names)
+
+def columns_for(summaries: list[str] | None = None) -> list[str]:
+    """Table columns needed to compute ``summaries`` (the defaults if None), in table order."""
+    names = DEFAULT_SUMMARIES if summaries is None else _check_summaries(summaries)
+    need = {c for n in names for c in SUMMARIES[n][1].columns}
+    return [c for c in ["timestamp", *DTYPES] if c in need]
 
 def export_csv_summaries(df: pd.DataFrame, outdir: Path):
-    ensure_dir(outdir)
-    pd.DataFrame([basic_stats(df)]).to_csv(outdir / "summary_overall.csv", index=False)
-    messages_per_sender(df).to_csv(outdir / "summary_messages_per_sender.csv", index=False)
-    daily_timeline(df).to_csv(outdir / "summary_daily_timeline.csv", index=False)
-    hourly_timeline(df).to_csv(outdir / "summary_hourly_timeline.csv", index=False)
-    top_words(df).to_csv(outdir / "summary_top_words.csv", index=False)
-    emoji_freq(df).to_csv(outdir / "summary_emoji_freq.csv", index=False)
-    weekday_hour_heatmap(df).to_csv(outdir / "summary_weekday_hour_heatmap.csv")
+    analyze(df).export(outdir)
@@ -0,0 +1,105 @@
+"""Run the full pipeline over many exports in one process pool.
+
+Jobs are submitted largest file first so a big chat never starts last and
+holds up the whole run. Each chat writes to its own directory and a failing
+export is recorded in the manifest instead of stopping the batch.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import glob
+import json
+import os
+import time
+import traceback
+import pandas as pd
+
+from . import instrument
+from .pipeline import run_full
+from .utils import ensure_dir
+
+SUMMARY_FILE = "batch_summary.csv"
+MANIFEST_FILE = "batch_manifest.json"
+
+def find_exports(source: str) -> list[Path]:
+    """``source`` is a directory (every ``*.txt`` in it) or a glob pattern."""
+    p = Path(source)
+    found = p.glob("*.txt") if p.is_dir() else map(Path, glob.glob(source, recursive=True))
+    return sorted(f for f in found if f.is_file())
+
+def _chat_dirs(paths: list[Path], outdir: Path) -> dict[Path, Path]:
+    """One output directory per export, named after the file (suffixed on stem clashes)."""
+    seen: dict[str, int] = {}
+    dirs = {}
+    for p in paths:
+        n = seen[p.stem] = seen.get(p.stem, 0) + 1
+        dirs[p] = outdir / (p.stem if n == 1 else f"{p.stem}-{n}")
+    return dirs
+
+def _run_chat(job: tuple) -> dict:
+    raw, workdir, charts, incremental = job
+    entry = {"input": str(raw), "outdir": str(workdir), "bytes": raw.stat().st_size}
+    t0 = time.perf_counter()
+    with instrument.Recorder() as rec:
+        try:
+            # parallelism is across chats, so each chat runs single-process
+            res = run_full(raw, workdir, workers=1, charts=charts,
+                           incremental=incremental, plot_workers=1)
+            entry.update(status="ok", rows=res["rows"], stats=res["stats"])
+        except Exception as exc:
+            entry.update(status="error", error=f"{type(exc).__name__}: {exc}",
+                         traceback=traceback.format_exc())
+    entry["seconds"] = round(time.perf_counter() - t0, 4)
+    entry["stages"] = {name: round(s["seconds"], 4) for name, s in rec.stages.items()}
+    return entry
+
+def summary_table(entries: list[dict]) -> pd.DataFrame:
+    """One row of overall stats per successfully processed chat."""
+    rows = []
+    for e in entries:
+        if e["status"] != "ok":
+            continue
+        st = e["stats"]
+        rows.append({"chat": Path(e["outdir"]).name, "total_messages": st["total_messages"],
+                     "participants": len(st["participants"]), "media_messages": st["media_messages"],
+                     "total_emojis": st["total_emojis"], "links_shared": st["links_shared"],
+                     "date_min": st["date_min"], "date_max": st["date_max"], "seconds": e["seconds"]})
+    cols = ["chat", "total_messages", "participants", "media_messages", "total_emojis",
+            "links_shared", "date_min", "date_max", "seconds"]
+    return pd.DataFrame(rows, columns=cols)
+
+def run_batch(paths: list[Path], outdir: Path, workers: int | None = None,
+              charts: list[str] | None = None, incremental: bool = False) -> list[dict]:
+    """Process every export and write the cross-chat summary and manifest to ``outdir``.
+
+    Returns the manifest entries in submission order (largest file first).
+    """
+    ensure_dir(outdir)
+    paths = sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+    dirs = _chat_dirs(paths, outdir)
+    jobs = [(p, dirs[p], charts, incremental) for p in paths]
+
+    t0 = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers <= 1:
+        entries = [_run_chat(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(_run_chat, j): i for i, j in enumerate(jobs)}
+            entries = [None] * len(jobs)
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    entries[i] = fut.result()
+                except Exception as exc:  # the worker itself died (e.g. out of memory)
+                    raw, workdir = jobs[i][:2]
+                    entries[i] = {"input": str(raw), "outdir": str(workdir), "status": "error",
+                                  "error": f"{type(exc).__name__}: {exc}", "seconds": None, "stages": {}}
+
+    summary_table(entries).to_csv(outdir / SUMMARY_FILE, index=False)
+    manifest = {"workers": workers, "seconds": round(time.perf_counter() - t0, 4),
+                "ok": sum(e["status"] == "ok" for e in entries),
+                "failed": sum(e["status"] != "ok" for e in entries),
+                "chats": entries}
+    (outdir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+    return entries
@@ -0,0 +1,88 @@
+"""Content-addressed cache of parsed chats.
+
+Entries are keyed by a hash of the raw export plus the parser version and
+timezone. Parsed frames live in a size-bounded in-memory LRU and are also
+spilled to parquet, so a rerun or a repeat upload never parses twice.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+import pandas as pd
+
+from .parser import PARSER_VERSION, parse_chat
+from .utils import ensure_dir, read_table, save_df
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def cache_key(data: bytes, timezone: str) -> str:
+    h = hashlib.sha256(data)
+    h.update(f"\0{PARSER_VERSION}\0{timezone}".encode())
+    return h.hexdigest()
+
+class ParseCache:
+    """Thread-safe parse cache. Returned frames are shared, treat them as read-only."""
+
+    def __init__(self, spill_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.spill_dir = spill_dir
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, df: pd.DataFrame):
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (df, size)
+            self._bytes += size
+            # evict least recently used entries, but always keep the newest one
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, old) = self._entries.popitem(last=False)
+                self._bytes -= old
+
+    def _lookup(self, key: str) -> pd.DataFrame | None:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                return hit[0]
+        spilled = self.spill_dir / f"{key}.parquet"
+        if spilled.exists():
+            df = read_table(spilled)
+            self._remember(key, df)
+            return df
+        return None
+
+    def _parse(self, key: str, data: bytes, timezone: str) -> pd.DataFrame:
+        ensure_dir(self.spill_dir)
+        # private temp files: concurrent uploads never share a path
+        fd, tmp = tempfile.mkstemp(dir=self.spill_dir, suffix=".txt")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            df = parse_chat(Path(tmp), timezone)
+        finally:
+            os.unlink(tmp)
+        fd, tmp = tempfile.mkstemp(dir=self.spill_dir, suffix=".parquet")
+        os.close(fd)
+        save_df(df, Path(tmp))
+        os.replace(tmp, self.spill_dir / f"{key}.parquet")
+        return df
+
+    def get(self, data: bytes, timezone: str = "Asia/Kolkata", key: str | None = None) -> pd.DataFrame:
+        """Return the parsed chat for the raw export ``data``, parsing only on a miss.
+
+        ``key`` is :func:`cache_key` of ``data`` if the caller already has it.
+        """
+        key = key or cache_key(data, timezone)
+        df = self._lookup(key)
+        if df is None:
+            df = self._parse(key, data, timezone)
+            self._remember(key, df)
+        return df
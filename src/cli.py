@@ -1,66 +1,228 @@
 import argparse
 from pathlib import Path
-from .parser import parse_chat
-from .analyzer import export_csv_summaries
-from .visuals import plot_all
-from .utils import ensure_dir, save_df, read_table
+from . import instrument
+from .visuals import CHARTS  # cheap: the plotting stack is imported only when drawing
+
+# Each command imports what it needs when it runs, so `--help` and `parse` do not
+# pay for pandas/matplotlib/wordcloud imports they never use.
 
 def cmd_parse(args):
-    df = parse_chat(Path(args.input))
+    from .pipeline import parse_export, write_table
+    df = parse_export(Path(args.input), args.workers)
     out = Path(args.output)
-    save_df(df, out)
+    write_table(df, out, args.partition)
     print(f"Parsed -> {out}")
 
 def cmd_analyze(args):
-    df = read_table(Path(args.input))
-    export_csv_summaries(df, Path(args.outdir))
+    from .analyzer import analyze, columns_for
+    from .pipeline import load_table
+    # only the columns the requested summaries read are loaded
+    summaries = _summaries(args)
+    df = load_table(Path(args.input), columns=columns_for(summaries), **_filters(args))
+    analyze(df, summaries, approx=args.approx).export(Path(args.outdir), summaries)
     print(f"CSV summaries saved to {args.outdir}")
 
+def _filters(args) -> dict:
+    return {"since": args.since, "until": args.until, "senders": args.sender}
+
+def _print_timings(timings: dict[str, float]):
+    for name, secs in timings.items():
+        print(f"  {name:<22s} {secs:6.2f}s")
+
 def cmd_visualize(args):
-    df = read_table(Path(args.input))
-    plot_all(df, Path(args.outdir))
+    from .analyzer import analyze, columns_for
+    from .pipeline import load_table
+    from .visuals import CHART_SUMMARY, plot_all
+    summaries = [CHART_SUMMARY[c] for c in (args.charts or CHARTS)]
+    df = load_table(Path(args.input), columns=columns_for(summaries), **_filters(args))
+    timings = plot_all(df, Path(args.outdir), analyze(df, summaries), charts=args.charts)
     print(f"Charts saved to {args.outdir}")
+    _print_timings(timings)
 
 def cmd_full(args):
-    raw = Path(args.input)
-    workdir = Path(args.workdir)
-    proc = workdir / "data" / "processed" / (raw.stem + ".parquet")
-    reports = workdir / "reports"
-    ensure_dir(proc.parent); ensure_dir(reports)
-    df = parse_chat(raw)
-    save_df(df, proc)
-    export_csv_summaries(df, reports)
-    plot_all(df, reports)
-    print(f"Done. Processed={proc}  Reports={reports}")
+    from .pipeline import run_full
+    res = run_full(Path(args.input), Path(args.workdir), workers=args.workers,
+                   charts=args.charts, incremental=args.incremental,
+                   partition=args.partition, approx=args.approx, summaries=_summaries(args))
+    print(f"Done. Processed={res['processed']}  Reports={res['reports']}")
+    _print_timings(res["charts"])
+
+def cmd_summarize(args):
+    from .stream import summarize_stream
+    summarize_stream(Path(args.input), Path(args.outdir), summaries=_summaries(args),
+                     workers=args.workers, batch_size=args.batch_size, approx=args.approx)
+    print(f"CSV summaries saved to {args.outdir}")
+
+def cmd_batch(args):
+    from .batch import find_exports, run_batch
+    paths = find_exports(args.input)
+    if not paths:
+        raise SystemExit(f"No exports found for {args.input!r}")
+    outdir = Path(args.outdir)
+    entries = run_batch(paths, outdir, workers=args.workers, charts=args.charts,
+                        incremental=args.incremental)
+    for e in entries:
+        secs = f"{e['seconds']:7.2f}s" if e["seconds"] is not None else "      -"
+        print(f"  {e['status']:<5s} {secs}  {e['input']}" + (f"  ({e['error']})" if e["status"] != "ok" else ""))
+    failed = sum(e["status"] != "ok" for e in entries)
+    print(f"Processed {len(entries) - failed}/{len(entries)} chats -> {outdir}")
+    if failed:
+        raise SystemExit(1)
+
+def _date(value: str):
+    import datetime
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date as YYYY-MM-DD, got {value!r}")
+
+def _add_filters(sp):
+    sp.add_argument("--since", type=_date, default=None, help="Only messages on or after this date (YYYY-MM-DD)")
+    sp.add_argument("--until", type=_date, default=None, help="Only messages on or before this date (YYYY-MM-DD)")
+    sp.add_argument("--sender", action="append", default=None,
+                    help="Only messages from this sender (repeat for several)")
+
+def _summary_list(value: str) -> list[str]:
+    from .analyzer import SUMMARIES
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SUMMARIES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown summary(s) {', '.join(unknown)}; choose from {', '.join(SUMMARIES)}")
+    return names
+
+def _add_approx(sp):
+    sp.add_argument("--approx", type=int, default=None, metavar="N",
+                    help="Approximate top words/emoji tracking at most N items each "
+                         "(bounded memory; adds an error column). Exact by default")
+
+def _add_sentiment(sp):
+    sp.add_argument("--sentiment", action="store_true",
+                    help="Also write daily and per-sender VADER sentiment summaries")
+    sp.add_argument("--sentiment-workers", type=int, default=None, metavar="N",
+                    help="Score new texts with N processes (default: all CPUs)")
+
+def _summaries(args) -> list[str] | None:
+    """The requested summaries; sentiment ones get the on-disk score cache."""
+    from .analyzer import DEFAULT_SUMMARIES, SENTIMENT_SUMMARIES
+    names = getattr(args, "summaries", None)
+    if args.sentiment:
+        names = list(names or DEFAULT_SUMMARIES)
+        names += [n for n in SENTIMENT_SUMMARIES if n not in names]
+    if names and set(names) & set(SENTIMENT_SUMMARIES):
+        from . import sentiment
+        from .config import SENTIMENT_CACHE
+        sentiment.configure(SENTIMENT_CACHE, args.sentiment_workers)
+    return names
+
+def _chart_list(value: str) -> list[str]:
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in CHARTS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown chart(s) {', '.join(unknown)}; choose from {', '.join(CHARTS)}")
+    return names
 
 def build_parser():
     p = argparse.ArgumentParser(prog="whatsapp-chat-analyzer", description="WhatsApp Chat Data Analyzer")
     sp = p.add_subparsers(dest="cmd", required=True)
+    # shared by every subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--profile", action="store_true",
+                        help="Print wall time, rows and peak memory per pipeline stage")
+    common.add_argument("--profile-out", metavar="FILE", default=None,
+                        help="Also run under cProfile and dump pstats to FILE (implies --profile)")
 
-    pp = sp.add_parser("parse", help="Parse .txt -> dataframe")
+    pp = sp.add_parser("parse", parents=[common], help="Parse .txt -> dataframe")
     pp.add_argument("--input", required=True)
     pp.add_argument("--output", required=True)
+    pp.add_argument("--workers", type=int, default=1, help="Parse with N processes")
+    pp.add_argument("--partition", action="store_true",
+                    help="Write a year/month partitioned Parquet dataset directory instead of one file")
     pp.set_defaults(func=cmd_parse)
 
-    pa = sp.add_parser("analyze", help="Compute CSV summaries")
+    pa = sp.add_parser("analyze", parents=[common], help="Compute CSV summaries")
     pa.add_argument("--input", required=True)
     pa.add_argument("--outdir", required=True)
+    pa.add_argument("--summaries", type=_summary_list, default=None,
+                    help="Comma-separated subset of: overall, messages_per_sender, daily_timeline, "
+                         "hourly_timeline, top_words, emoji_freq, weekday_hour_heatmap, top_domains, "
+                         "reply_times, reply_matrix, sessions, sentiment_daily, sentiment_senders")
+    _add_filters(pa)
+    _add_approx(pa)
+    _add_sentiment(pa)
     pa.set_defaults(func=cmd_analyze)
 
-    pv = sp.add_parser("visualize", help="Create PNG charts")
+    pv = sp.add_parser("visualize", parents=[common], help="Create PNG charts")
     pv.add_argument("--input", required=True)
     pv.add_argument("--outdir", required=True)
+    _add_filters(pv)
+    pv.add_argument("--charts", type=_chart_list, default=None,
+                    help=f"Comma-separated subset of: {', '.join(CHARTS)}")
     pv.set_defaults(func=cmd_visualize)
 
-    pf = sp.add_parser("full", help="Parse + analyze + visualize")
+    pf = sp.add_parser("full", parents=[common], help="Parse + analyze + visualize")
     pf.add_argument("--input", required=True)
     pf.add_argument("--workdir", required=True)
+    pf.add_argument("--workers", type=int, default=1, help="Parse with N processes")
+    pf.add_argument("--charts", type=_chart_list, default=None,
+                    help=f"Comma-separated subset of: {', '.join(CHARTS)}")
+    pf.add_argument("--incremental", action="store_true",
+                    help="Only parse what was appended since the last run (falls back to a full rebuild)")
+    pf.add_argument("--partition", action="store_true",
+                    help="Write a year/month partitioned Parquet dataset directory instead of one file")
+    _add_approx(pf)
+    _add_sentiment(pf)
     pf.set_defaults(func=cmd_full)
+
+    ps = sp.add_parser("summarize", parents=[common],
+                       help="Stream .txt -> CSV summaries without building the processed table")
+    ps.add_argument("--input", required=True)
+    ps.add_argument("--outdir", required=True)
+    ps.add_argument("--workers", type=int, default=1, help="Aggregate with N processes")
+    ps.add_argument("--batch-size", type=int, default=100_000,
+                    help="Messages held in memory at a time (default: 100000)")
+    ps.add_argument("--summaries", type=_summary_list, default=None,
+                    help="Comma-separated subset of the summaries written by 'analyze'")
+    _add_approx(ps)
+    _add_sentiment(ps)
+    ps.set_defaults(func=cmd_summarize)
+
+    pb = sp.add_parser("batch", parents=[common], help="Run the full pipeline over many exports")
+    pb.add_argument("--input", required=True, help="Directory of .txt exports or a glob pattern")
+    pb.add_argument("--outdir", required=True, help="One sub-directory per chat is created here")
+    pb.add_argument("--workers", type=int, default=None, help="Process N chats at once (default: all CPUs)")
+    pb.add_argument("--charts", type=_chart_list, default=None,
+                    help=f"Comma-separated subset of: {', '.join(CHARTS)}")
+    pb.add_argument("--incremental", action="store_true",
+                    help="Reuse each chat's checkpoint from a previous batch into the same --outdir")
+    pb.set_defaults(func=cmd_batch)
     return p
 
+def run_profiled(args):
+    """Run a subcommand and print its stage table (plus a cProfile dump with ``--profile-out``)."""
+    import cProfile
+    import pstats
+    prof = cProfile.Profile() if args.profile_out else None
+    with instrument.Recorder() as rec:
+        if prof:
+            prof.enable()
+        try:
+            args.func(args)
+        finally:
+            if prof:
+                prof.disable()
+    print()
+    print(rec.table())
+    if prof:
+        prof.dump_stats(args.profile_out)
+        print(f"cProfile stats -> {args.profile_out}")
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(15)
+
 def main():
     args = build_parser().parse_args()
-    args.func(args)
+    if args.profile or args.profile_out:
+        run_profiled(args)
+    else:
+        args.func(args)
 
 if __name__ == "__main__":
     main()
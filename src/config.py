@@ -3,5 +3,7 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 DATA_RAW = ROOT / "data" / "raw"
 DATA_PROCESSED = ROOT / "data" / "processed"
+PARSE_CACHE = ROOT / "data" / "cache"
+SENTIMENT_CACHE = PARSE_CACHE / "sentiment"
 REPORTS = ROOT / "reports"
 TIMEZONE = "Asia/Kolkata"
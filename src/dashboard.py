@@ -0,0 +1,104 @@
+"""Per-day rollups behind the dashboard's date-range filter.
+
+:class:`DailyRollup` is built once per chat. It keeps small per-day arrays
+(messages, media, emojis, links, a day x hour grid and per-day sender
+counts), and :meth:`DailyRollup.between` re-aggregates any range of days
+from them alone into an :class:`~src.analyzer.AnalysisResult`, so moving the
+date slider never rescans the messages. Word and emoji counts are not kept
+per day; read them from the whole chat's analysis.
+"""
+from __future__ import annotations
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+from .analyzer import AnalysisResult, ChatAggregates
+
+def _per_day(codes: np.ndarray, n: int, weights=None) -> np.ndarray:
+    return np.bincount(codes, weights=weights, minlength=n).astype("int64")
+
+class DailyRollup:
+    def __init__(self, days: np.ndarray, grid: np.ndarray, totals: pd.DataFrame,
+                 sender_days: np.ndarray, sender_names: np.ndarray, sender_counts: np.ndarray,
+                 tz=None):
+        self.days = days                   # distinct dates, ascending (datetime64[ns])
+        self.grid = grid                   # (day, hour) -> messages, all rows
+        self.totals = totals               # per day: messages, media, emojis, links (user rows), first, last (UTC ns)
+        self.sender_days = sender_days     # (day, sender) -> messages, sorted by day
+        self.sender_names = sender_names
+        self.sender_counts = sender_counts
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DailyRollup":
+        """Roll up a parsed frame; rows without a date are left out."""
+        codes, days = pd.factorize(df["date"], sort=True)
+        days = np.asarray(days, dtype="datetime64[ns]")
+        n = len(days)
+        dated = codes >= 0
+        timed = dated & df["hour"].notna().to_numpy()
+        grid = _per_day(codes[timed] * 24 + df["hour"].to_numpy("int64", na_value=0)[timed], n * 24) \
+            .reshape(n, 24)
+        user = dated & ~df["is_system"].fillna(False).to_numpy(bool)
+        uc = codes[user]
+        ts = df["timestamp"]
+        stamped = dated & ts.notna().to_numpy()
+        ns = pd.Series(ts.dt.tz_convert("UTC").to_numpy("datetime64[ns]")[stamped].view("int64"))
+        bounds = ns.groupby(codes[stamped]).agg(["min", "max"]).reindex(range(n))
+        totals = pd.DataFrame({
+            "messages": _per_day(uc, n),
+            "media": _per_day(uc, n, df["is_media"].fillna(False).to_numpy(bool)[user]),
+            "emojis": _per_day(uc, n, df["emoji_count"].to_numpy()[user]),
+            "links": _per_day(uc, n, df["link_count"].to_numpy()[user]),
+            "first": bounds["min"].to_numpy(), "last": bounds["max"].to_numpy(),
+        })
+        named = user & df["sender"].notna().to_numpy()
+        pairs = pd.DataFrame({"day": codes[named], "sender": df["sender"].to_numpy(object)[named]}) \
+            .value_counts().sort_index()
+        return cls(days, grid, totals,
+                   pairs.index.get_level_values("day").to_numpy("int64"),
+                   pairs.index.get_level_values("sender").to_numpy(object),
+                   pairs.to_numpy("int64"), ts.dt.tz)
+
+    @property
+    def first_day(self) -> pd.Timestamp | None:
+        return pd.Timestamp(self.days[0]) if len(self.days) else None
+
+    @property
+    def last_day(self) -> pd.Timestamp | None:
+        return pd.Timestamp(self.days[-1]) if len(self.days) else None
+
+    def daily_counts(self) -> pd.Series:
+        """Messages per day (all rows), indexed by date."""
+        return pd.Series(self.grid.sum(axis=1), index=pd.DatetimeIndex(self.days, name="date"),
+                         name="messages")
+
+    def between(self, since=None, until=None) -> AnalysisResult:
+        """Count summaries of the days ``since`` .. ``until`` (inclusive; None: open)."""
+        lo = 0 if since is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(since)), "left"))
+        hi = len(self.days) if until is None else \
+            int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(until)), "right"))
+        grid, totals = self.grid[lo:hi], self.totals.iloc[lo:hi]
+        days = pd.DatetimeIndex(self.days[lo:hi])
+        per_day = grid.sum(axis=1)
+        heat = np.zeros((7, 24), dtype="int64")
+        np.add.at(heat, days.dayofweek, grid)
+        s_lo, s_hi = np.searchsorted(self.sender_days, [lo, hi], "left")
+        senders = pd.Series(self.sender_counts[s_lo:s_hi]) \
+            .groupby(self.sender_names[s_lo:s_hi]).sum()
+        agg = ChatAggregates(
+            total_messages=int(totals["messages"].sum()),
+            participants=set(senders.index),
+            media_messages=int(totals["media"].sum()),
+            total_emojis=int(totals["emojis"].sum()),
+            links_shared=int(totals["links"].sum()),
+            senders=Counter({s: int(c) for s, c in senders.items()}),
+            daily=Counter({d: int(c) for d, c in zip(days.strftime("%Y-%m-%d"), per_day) if c}),
+            hourly=Counter({h: int(c) for h, c in enumerate(grid.sum(axis=0)) if c}),
+            heatmap=Counter({(int(w), int(h)): int(heat[w, h]) for w, h in zip(*heat.nonzero())}),
+        )
+        first, last = totals["first"].dropna(), totals["last"].dropna()
+        if len(first):
+            agg.date_min = pd.Timestamp(int(first.min()), tz="UTC").tz_convert(self.tz)
+            agg.date_max = pd.Timestamp(int(last.max()), tz="UTC").tz_convert(self.tz)
+        return AnalysisResult(agg)
@@ -0,0 +1,37 @@
+"""Largest-Triangle-Three-Buckets (LTTB) downsampling for line charts.
+
+A decade-long daily timeline has thousands of points but a chart is only a
+few hundred pixels wide. :func:`lttb` keeps ``n`` points: the first, the
+last, and from each of ``n - 2`` equal buckets in between the point forming
+the largest triangle with the point kept before it and the mean of the next
+bucket, so peaks and dips survive where plain striding would drop them.
+"""
+from __future__ import annotations
+import numpy as np
+
+def lttb(x, y, n: int) -> np.ndarray:
+    """Indices of the ``n`` points of ``(x, y)`` to plot (``x`` ascending).
+
+    All indices are returned when there are at most ``n`` points.
+    """
+    if n < 3:
+        raise ValueError("n must be >= 3")
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    size = len(x)
+    if size <= n:
+        return np.arange(size)
+    # bucket edges over the interior points 1 .. size-2
+    edges = np.linspace(1, size - 1, n - 1).astype("int64")
+    keep = np.empty(n, dtype="int64")
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < n - 1 else size
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        # twice the triangle areas; the constant factor does not change the argmax
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
@@ -0,0 +1,112 @@
+"""Incremental re-analysis of chat exports that only grew at the end.
+
+A checkpoint is stored next to the processed parquet. It records the byte
+offset of the last message header, a hash of everything before it and the
+:class:`~src.analyzer.ChatAggregates` of the messages before that offset.
+The last message is kept open because a later export may add continuation
+lines to it. On the next run only the bytes from that offset on are parsed;
+if the prefix hash no longer matches, everything is rebuilt. So is an export
+whose dates were all ambiguous (day/month order guessed) once a new message
+settles the order differently.
+"""
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+import pandas as pd
+
+from .analyzer import ChatAggregates
+from .parser import _header_lines, last_header_offset, parse_chat, parse_range, sniff_timestamp_order
+from .utils import read_table, save_df
+
+CHECKPOINT_VERSION = 5
+
+def checkpoint_path(proc: Path) -> Path:
+    return proc.with_name(proc.stem + ".checkpoint.json")
+
+def _prefix_hash(path: Path, offset: int, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        left = offset
+        while left > 0:
+            chunk = fh.read(min(block, left))
+            if not chunk:
+                break
+            h.update(chunk)
+            left -= len(chunk)
+    return h.hexdigest()
+
+def _load_checkpoint(path: Path) -> dict | None:
+    try:
+        ck = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return ck if ck.get("version") == CHECKPOINT_VERSION else None
+
+def _usable(ck: dict | None, raw: Path, proc: Path, timezone: str, approx: int | None,
+            summaries: list[str] | None) -> bool:
+    if not ck or not proc.exists() or ck["timezone"] != timezone or ck.get("approx") != approx:
+        return False
+    if ck.get("summaries") != summaries:  # the stored aggregates only cover these
+        return False
+    if raw.stat().st_size < ck["offset"]:
+        return False
+    if _prefix_hash(raw, ck["offset"]) != ck["prefix_sha256"]:
+        return False
+    # a proven order holds for the unchanged prefix; a guessed one may be overturned
+    return ck["fmt_proven"] or sniff_timestamp_order(_header_lines(raw))[0] == ck["fmt"]
+
+def update_incremental(raw: Path, proc: Path, timezone: str = "Asia/Kolkata",
+                       workers: int = 1, partition: bool = False,
+                       approx: int | None = None,
+                       summaries: list[str] | None = None) -> tuple[pd.DataFrame, ChatAggregates]:
+    """Parse ``raw`` into ``proc``, reusing the checkpoint when the export only grew.
+
+    Returns the full parsed frame and the aggregates of the whole chat (for
+    ``summaries``, the defaults if None).
+    """
+    ck_path = checkpoint_path(proc)
+    ck = _load_checkpoint(ck_path)
+    if _usable(ck, raw, proc, timezone, approx, summaries):
+        fmt, proven = ck["fmt"], ck["fmt_proven"]
+        if not proven:  # the new messages may settle the guessed order
+            proven = sniff_timestamp_order(_header_lines(raw))[1]
+        rows_before = ck["rows_before"]
+        prev = read_table(proc)
+        tail = parse_range(raw, ck["offset"], None, fmt, timezone)
+        if len(prev) and len(tail):
+            # the stored table comes back as zoneinfo, the parser uses dateutil; same zone,
+            # but mismatched dtypes would turn the concatenated column into objects
+            tail["timestamp"] = tail["timestamp"].dt.tz_convert(prev["timestamp"].dt.tz)
+        df = pd.concat([prev.iloc[:rows_before], tail], ignore_index=True)
+        closed = ChatAggregates.from_dict(ck["aggregates"])
+    else:
+        fmt, proven = sniff_timestamp_order(_header_lines(raw))
+        rows_before = 0
+        df = parse_chat(raw, timezone, workers)
+        closed = ChatAggregates()
+    save_df(df, proc, partition=partition)
+
+    offset = last_header_offset(raw)
+    if offset is None:
+        ck_path.unlink(missing_ok=True)
+        return df, closed.merge(ChatAggregates.from_frame(df.iloc[rows_before:], summaries, approx))
+
+    # everything from the last header on stays open until the next run
+    new_before = len(df) - len(parse_range(raw, offset, None, fmt, timezone))
+    closed = closed.merge(ChatAggregates.from_frame(df.iloc[rows_before:new_before], summaries, approx))
+    ts = df["timestamp"].iloc[:new_before].dropna()
+    ck_path.write_text(json.dumps({
+        "version": CHECKPOINT_VERSION,
+        "timezone": timezone,
+        "approx": approx,
+        "summaries": summaries,
+        "fmt": fmt,
+        "fmt_proven": proven,
+        "offset": offset,
+        "prefix_sha256": _prefix_hash(raw, offset),
+        "rows_before": new_before,
+        "last_timestamp": ts.iloc[-1].isoformat() if len(ts) else None,
+        "aggregates": closed.to_dict(),
+    }, ensure_ascii=False), encoding="utf-8")
+    return df, closed.merge(ChatAggregates.from_frame(df.iloc[new_before:], summaries, approx))
@@ -0,0 +1,128 @@
+"""Positional index over a parsed chat for fast date-range and sender queries.
+
+    idx = ChatIndex.build(df)
+    sub = idx.select(df, since="2024-03-01", until="2024-03-31", senders=["Alice"])
+    analyze(sub).basic_stats()
+
+A query is a few binary searches plus a gather of the matching rows, i.e.
+O(log n + k) instead of boolean-masking all n rows.
+"""
+from __future__ import annotations
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+def index_path(proc: Path) -> Path:
+    """Where the index of processed table ``proc`` is stored (next to it)."""
+    return proc.with_suffix(".index.npz")
+
+def _day_number(value) -> int:
+    return int(pd.Timestamp(value).normalize().value // 86_400_000_000_000)
+
+class ChatIndex:
+    """Rows of a frame in timestamp order, with per-day and per-sender offsets.
+
+    ``order[p]`` is the frame row at position ``p``. Positions ``[0, n_timed)``
+    are the rows with a timestamp, sorted by it; rows without one follow in
+    file order. ``day_starts[i]`` is the first position of local calendar day
+    ``days[i]`` and each sender's positions are kept sorted, so every query is
+    a binary search on small arrays.
+    """
+
+    def __init__(self, order: np.ndarray, ts: np.ndarray, days: np.ndarray,
+                 day_starts: np.ndarray, senders: dict[str, np.ndarray]):
+        self.order = order
+        self.ts = ts                  # UTC ns of positions [0, n_timed)
+        self.days = days              # local day numbers (days since epoch), ascending
+        self.day_starts = day_starts  # len(days) + 1 offsets into order
+        self.senders = senders        # sender -> ascending positions
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "ChatIndex":
+        if df.empty:  # an export without messages
+            none = np.empty(0, dtype=np.int64)
+            return cls(none, none, none, np.zeros(1, dtype=np.int64), {})
+        ts = df["timestamp"]
+        timed = ts.notna().to_numpy()
+        utc = ts.dt.tz_convert("UTC") if ts.dt.tz is not None else ts
+        ns = utc.to_numpy(dtype="datetime64[ns]").view("int64")
+        timed_rows = np.flatnonzero(timed)
+        order = np.concatenate([timed_rows[np.argsort(ns[timed_rows], kind="stable")],
+                                np.flatnonzero(~timed)]).astype(np.int64)
+        n_timed = len(timed_rows)
+        # local calendar days are non-decreasing along the timestamp order
+        day = df["date"].to_numpy(dtype="datetime64[D]").view("int64")[order[:n_timed]]
+        days, starts = np.unique(day, return_index=True)
+        codes, names = pd.factorize(df["sender"])
+        codes = codes[order]
+        # a stable sort by sender code keeps each sender's positions ascending
+        by_sender = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[by_sender], np.arange(len(names) + 1))
+        senders = {str(name): by_sender[bounds[i]:bounds[i + 1]].astype(np.int64)
+                   for i, name in enumerate(names)}
+        return cls(order, ns[order[:n_timed]], days.astype(np.int64),
+                   np.append(starts, n_timed).astype(np.int64), senders)
+
+    def _day_bounds(self, since, until) -> tuple[int, int]:
+        lo, hi = 0, self.n_rows
+        if since is not None or until is not None:
+            lo, hi = 0, int(self.day_starts[-1])  # untimed rows never match a date filter
+        if since is not None:
+            lo = int(self.day_starts[np.searchsorted(self.days, _day_number(since), "left")])
+        if until is not None:
+            hi = int(self.day_starts[np.searchsorted(self.days, _day_number(until), "right")])
+        return lo, max(lo, hi)
+
+    def positions(self, since=None, until=None, senders: list[str] | None = None) -> np.ndarray:
+        """Index positions of the rows on days ``[since, until]`` sent by ``senders``."""
+        lo, hi = self._day_bounds(since, until)
+        if not senders:
+            return np.arange(lo, hi)
+        parts = []
+        for name in senders:
+            pos = self.senders.get(name)
+            if pos is not None:
+                parts.append(pos[np.searchsorted(pos, lo):np.searchsorted(pos, hi)])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def rows(self, since=None, until=None, senders: list[str] | None = None) -> np.ndarray:
+        """Frame row numbers matching the query, in file order."""
+        return np.sort(self.order[self.positions(since, until, senders)])
+
+    def rows_between(self, start, end) -> np.ndarray:
+        """Frame row numbers with ``start <= timestamp < end`` (tz-aware or UTC)."""
+        a = np.searchsorted(self.ts, pd.Timestamp(start).value, "left")
+        b = np.searchsorted(self.ts, pd.Timestamp(end).value, "left")
+        return np.sort(self.order[a:b])
+
+    def select(self, df: pd.DataFrame, since=None, until=None,
+               senders: list[str] | None = None) -> pd.DataFrame:
+        """The slice of ``df`` matching the query; pass it to any analyzer function."""
+        if len(df) != self.n_rows:
+            raise ValueError(f"index covers {self.n_rows} rows but the frame has {len(df)}")
+        return df.take(self.rows(since, until, senders))
+
+    def daily_counts(self) -> pd.Series:
+        """Rows per local day, straight from the day offsets."""
+        return pd.Series(np.diff(self.day_starts), index=pd.to_datetime(self.days, unit="D"), name="messages")
+
+    def save(self, path: Path):
+        names = list(self.senders)
+        lengths = [len(self.senders[n]) for n in names]
+        np.savez(path, order=self.order, ts=self.ts, days=self.days, day_starts=self.day_starts,
+                 sender_names=np.array(names, dtype=str),
+                 sender_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                 sender_positions=(np.concatenate([self.senders[n] for n in names])
+                                   if names else np.empty(0, dtype=np.int64)))
+
+    @classmethod
+    def load(cls, path: Path) -> "ChatIndex":
+        with np.load(path, allow_pickle=False) as z:
+            offsets, positions = z["sender_offsets"], z["sender_positions"]
+            senders = {str(n): positions[offsets[i]:offsets[i + 1]]
+                       for i, n in enumerate(z["sender_names"])}
+            return cls(z["order"], z["ts"], z["days"], z["day_starts"], senders)
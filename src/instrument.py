@@ -0,0 +1,132 @@
+"""Stage-level instrumentation.
+
+Pipeline code wraps its stages in :func:`stage` (or reports them with
+:func:`record`); every subscriber receives a :class:`StageEvent` with wall
+time, rows processed and peak RSS. With no subscribers both are no-ops, so
+the hooks cost nothing in normal runs.
+
+    from src import instrument
+    instrument.subscribe(lambda ev: metrics.observe(ev.name, ev.seconds))
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass
+import os
+import sys
+import threading
+import time
+from typing import Callable
+
+@dataclass
+class StageEvent:
+    name: str
+    seconds: float
+    rows: int | None = None
+    peak_rss: int | None = None  # bytes
+
+_subscribers: list[Callable[[StageEvent], None]] = []
+
+def subscribe(fn: Callable[[StageEvent], None]) -> Callable[[StageEvent], None]:
+    """Call ``fn`` with every stage event from now on. Returns ``fn``."""
+    _subscribers.append(fn)
+    return fn
+
+def unsubscribe(fn: Callable[[StageEvent], None]):
+    if fn in _subscribers:
+        _subscribers.remove(fn)
+
+def enabled() -> bool:
+    return bool(_subscribers)
+
+def _emit(event: StageEvent):
+    for fn in list(_subscribers):
+        fn(event)
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource  # not Linux: fall back to the process high-water mark
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+class PeakRss:
+    """Samples RSS in a background thread; ``peak`` is the maximum seen while active."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+class _Stage:
+    rows: int | None = None
+
+@contextmanager
+def stage(name: str, rows: int | None = None):
+    """Time the enclosed block as stage ``name``.
+
+    ``rows`` can also be set later through the yielded object
+    (``with stage("parse") as st: ...; st.rows = len(df)``).
+    """
+    st = _Stage()
+    st.rows = rows
+    if not _subscribers:
+        yield st
+        return
+    with PeakRss() as mem:
+        t0 = time.perf_counter()
+        yield st
+        secs = time.perf_counter() - t0
+    _emit(StageEvent(name, secs, st.rows, mem.peak))
+
+def record(name: str, seconds: float, rows: int | None = None):
+    """Report a stage that was timed by the caller (e.g. work interleaved with a generator)."""
+    if _subscribers:
+        _emit(StageEvent(name, seconds, rows, rss_bytes()))
+
+class Recorder:
+    """Subscriber that aggregates events by stage name, for the ``--profile`` table."""
+
+    def __init__(self):
+        self.stages: dict[str, dict] = {}
+
+    def __call__(self, ev: StageEvent):
+        s = self.stages.setdefault(ev.name, {"calls": 0, "seconds": 0.0, "rows": None, "peak_rss": 0})
+        s["calls"] += 1
+        s["seconds"] += ev.seconds
+        if ev.rows is not None:
+            s["rows"] = (s["rows"] or 0) + ev.rows
+        s["peak_rss"] = max(s["peak_rss"], ev.peak_rss or 0)
+
+    def __enter__(self):
+        return subscribe(self)
+
+    def __exit__(self, *exc):
+        unsubscribe(self)
+
+    def table(self) -> str:
+        lines = [f"{'stage':<28s} {'calls':>6s} {'seconds':>9s} {'rows':>11s} {'rows/s':>12s} {'peak RSS':>10s}"]
+        for name, s in self.stages.items():
+            rows = f"{s['rows']:,}" if s["rows"] is not None else "-"
+            rate = f"{s['rows'] / s['seconds']:,.0f}" if s["rows"] and s["seconds"] else "-"
+            lines.append(f"{name:<28s} {s['calls']:>6d} {s['seconds']:>9.3f} {rows:>11s} {rate:>12s} "
+                         f"{s['peak_rss'] / 2**20:>7.1f} MB")
+        return "\n".join(lines)
@@ -1,130 +1,434 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+import mmap
+import os
 import re
+import time
 from dateutil import parser as dtparser
 from dateutil.tz import gettz
+import numpy as np
 import pandas as pd
-import emoji
+
+from . import instrument
+from .utils import DTYPES, URL_PATTERN, compact_dtypes, emoji_pattern, url_domains
+
+# Bump whenever parse output changes so cached parses are invalidated
+PARSER_VERSION = "5"
 
 # Compile all patterns with IGNORECASE so 'pm'/'am' also match
 FLAGS = re.IGNORECASE
 
-# User message patterns (Android/iOS, with/without [brackets], with/without seconds)
-PATTERNS = [
-    re.compile(
-        r"^(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
-        r"(?:\s?(?P<ampm>[AP]M))?\s-\s(?P<name>[^:]+): (?P<msg>.*)$",
-        FLAGS
-    ),
-    re.compile(
-        r"^\[(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
-        r"(?:\s?(?P<ampm>[AP]M))?\]\s(?P<name>[^:]+): (?P<msg>.*)$",
-        FLAGS
-    ),
-]
-
-# System message patterns (no sender)
-SYS_PATTERNS = [
-    re.compile(
-        r"^(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
-        r"(?:\s?(?P<ampm>[AP]M))?\s-\s(?P<msg>.*)$",
-        FLAGS
-    ),
-    re.compile(
-        r"^\[(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
-        r"(?:\s?(?P<ampm>[AP]M))?\]\s(?P<msg>.*)$",
-        FLAGS
-    ),
-]
+# One header grammar covering Android/iOS, with/without [brackets] and seconds:
+# the optional "[" selects the iOS "...] " separator over the Android " - "
+# one, and the optional name group tells user messages apart from system
+# lines. No field may run across a line break, so the same pattern also scans
+# a block of many lines.
+_HEADER = (
+    r"^(?P<open>\[)?(?P<date>\d{1,2}/\d{1,2}/\d{2,4}), (?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+    r"(?:[^\S\n]?(?P<ampm>[AP]M))?(?(open)\][^\S\n]|[^\S\n]-[^\S\n])(?:(?P<name>[^:\n]+): )?(?P<msg>.*)$"
+)
+
+# a single line (header sniffing, worker and incremental boundaries)
+LINE_PATTERN = re.compile(_HEADER, FLAGS)
+# every header line of a decoded block (re.M), for the parser itself
+BLOCK_PATTERN = re.compile(_HEADER, FLAGS | re.M)
+
+# Every header starts with a digit or "["; anything else is a continuation line
+_HEAD_CHARS = frozenset("0123456789[")
 
 MEDIA_MARKERS = (
     "<Media omitted>", "image omitted", "video omitted",
     "sticker omitted", "audio omitted", "\u200eimage omitted",
     "\u200evideo omitted"
 )
+MEDIA_PATTERN = re.compile("|".join(re.escape(m) for m in MEDIA_MARKERS))
+
+# Column order of parsed frames
+COLUMNS = ["timestamp", "date", "time", "weekday", "hour", "sender", "message",
+           "is_system", "is_media", "emoji_list", "emoji_count", "link_count", "link_domains"]
 
 @dataclass
 class ChatLine:
-    ts: pd.Timestamp | None
+    # raw header fields; converted to timestamps a whole batch at a time
+    date: str | None
+    time: str | None
+    ampm: str | None
     name: str | None
     msg: str
     is_system: bool
 
-def _match_any(line: str, pats: Iterable[re.Pattern]):
-    for p in pats:
-        m = p.match(line)
-        if m:
-            return m
-    return None
+def classify_line(line: str) -> re.Match | None:
+    """Return the header match for a message line, or None for continuation lines.
+
+    ``m["name"]`` is None for system messages.
+    """
+    if line[:1] not in _HEAD_CHARS:
+        return None
+    return LINE_PATTERN.match(line)
+
+DEFAULT_BATCH_SIZE = 100_000
+
+# Bytes per worker below which a process pool costs more than it saves. Pickling
+# a worker's frame back is cheap (~25 ms for 12 MB); starting the pool and
+# sharing the CPUs is not, so each range must take seconds to parse
+# (benchmarks.run --workers)
+MIN_RANGE_BYTES = 16 << 20
+
+# bytes of the memory-mapped export decoded at a time
+_BLOCK = 1 << 23
 
-def parse_chat(path: Path, timezone: str = "Asia/Kolkata") -> pd.DataFrame:
-    tz = gettz(timezone)
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+@contextmanager
+def _mapped(path: Path):
+    """The export as a read-only memory map (``b""`` for an empty file)."""
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
 
-    records: list[ChatLine] = []
-    current: ChatLine | None = None
+def _blocks(buf, start: int, end: int) -> Iterator[str]:
+    """Decoded text of ``buf[start:end]`` in blocks of whole lines.
 
-    def flush(cur: ChatLine | None):
-        if cur:
-            records.append(cur)
+    Each block is decoded, stripped of left-to-right marks and normalized to
+    ``\\n`` line breaks in one pass, instead of line by line.
+    """
+    pos = start
+    while pos < end:
+        stop = min(pos + _BLOCK, end)
+        if stop < end:
+            nl = buf.rfind(b"\n", pos, stop)
+            stop = nl + 1 if nl >= 0 else buf.find(b"\n", stop, end) + 1 or end
+        yield buf[pos:stop].decode("utf-8", errors="ignore").replace("\u200e", "").replace("\r\n", "\n")
+        pos = stop
 
+def _header_lines(path: Path) -> Iterator[str]:
+    """Message header lines of the export, for :func:`sniff_timestamp_format`."""
+    with _mapped(path) as buf:
+        for text in _blocks(buf, 0, len(buf)):
+            for m in BLOCK_PATTERN.finditer(text):
+                yield m.group()
+
+def sniff_timestamp_format(lines: Iterable[str]) -> str | None:
+    """Detect the export's timestamp format once, as a strptime format string.
+
+    Year width, 12h/24h clock and seconds come from the first message header.
+    Day/month order is decided by the first header whose day or month is > 12;
+    if every date is ambiguous we fall back to month-first like dateutil does.
+    Returns None when the input has no message headers.
+    """
+    return sniff_timestamp_order(lines)[0]
+
+def sniff_timestamp_order(lines: Iterable[str]) -> tuple[str | None, bool]:
+    """:func:`sniff_timestamp_format`, and whether a header proved the day/month
+    order (False: every date was ambiguous and month-first was guessed)."""
+    first = None
+    order = None
     for raw in lines:
-        raw = raw.replace("\u200e", "").rstrip("\n")
-        mu = _match_any(raw, PATTERNS)
-        ms = _match_any(raw, SYS_PATTERNS) if not mu else None
-
-        if mu:
-            if current: flush(current)
-            d = mu.groupdict()
-            dt_str = f"{d['date']} {d['time']} {d.get('ampm') or ''}".strip()
-            try:
-                parsed = dtparser.parse(dt_str)  # dateutil handles many formats
-                ts = (pd.Timestamp(parsed).tz_localize(tz)
-                      if parsed.tzinfo is None else pd.Timestamp(parsed).tz_convert(tz))
-            except Exception:
-                ts = None
-            current = ChatLine(ts=ts, name=d["name"].strip(), msg=d["msg"], is_system=False)
-        elif ms:
-            if current: flush(current)
-            d = ms.groupdict()
-            dt_str = f"{d['date']} {d['time']} {d.get('ampm') or ''}".strip()
-            try:
-                parsed = dtparser.parse(dt_str)
-                ts = (pd.Timestamp(parsed).tz_localize(tz)
-                      if parsed.tzinfo is None else pd.Timestamp(parsed).tz_convert(tz))
-            except Exception:
-                ts = None
-            current = ChatLine(ts=ts, name=None, msg=d["msg"], is_system=True)
-        else:
-            # continuation of previous message
-            if current is None:
-                current = ChatLine(ts=None, name=None, msg=raw, is_system=True)
-            else:
-                current.msg += "\n" + raw
-
-    flush(current)
-
-    rows = []
-    for r in records:
-        text = (r.msg or "").strip()
-        is_media = any(m in text for m in MEDIA_MARKERS)
-        emjs = [ch for ch in text if ch in emoji.EMOJI_DATA]
-        rows.append({
-            "timestamp": r.ts,
-            "date": r.ts.date().isoformat() if r.ts else None,
-            "time": r.ts.strftime("%H:%M:%S") if r.ts else None,
-            "weekday": r.ts.strftime("%A") if r.ts else None,
-            "hour": r.ts.hour if r.ts else None,
-            "sender": r.name,
-            "message": text,
-            "is_system": r.is_system,
-            "is_media": is_media,
-            "emoji_list": "".join(emjs),
-            "emoji_count": len(emjs),
-        })
-
-    df = pd.DataFrame(rows)
-    # Keep only meaningful rows (non-empty messages or system markers)
+        m = classify_line(raw.replace("\u200e", ""))
+        if not m:
+            continue
+        if first is None:
+            first = m
+        a, b, _ = m.group("date").split("/")
+        if int(a) > 12:
+            order = "%d/%m"
+        elif int(b) > 12:
+            order = "%m/%d"
+        if order:
+            break
+    if first is None:
+        return None, False
+    year = "%y" if len(first.group("date").rsplit("/", 1)[1]) == 2 else "%Y"
+    clock = "%I" if first.group("ampm") else "%H"
+    secs = ":%S" if first.group("time").count(":") == 2 else ""
+    ampm = " %p" if first.group("ampm") else ""
+    return f"{order or '%m/%d'}/{year} {clock}:%M{secs}{ampm}", order is not None
+
+def _fallback_ts(dt_str: str, dayfirst: bool):
+    try:
+        return dtparser.parse(dt_str, dayfirst=dayfirst)  # dateutil handles many formats
+    except Exception:
+        return None
+
+def _parse_timestamps(dates: list, times: list, ampms: list, fmt: str | None, tz) -> pd.Series:
+    """Convert raw header strings to tz-aware timestamps in one vectorized call.
+
+    Strings that don't fit ``fmt`` are retried one by one with dateutil.
+    """
+    d = pd.Series(dates, dtype=object)
+    dt_str = (d + " " + pd.Series(times, dtype=object)
+              + (" " + pd.Series(ampms, dtype=object)).fillna(""))
+    if fmt:
+        ts = pd.to_datetime(dt_str, format=fmt, errors="coerce")
+    else:
+        ts = pd.Series(pd.NaT, index=d.index, dtype="datetime64[us]")
+    retry = ts.isna() & d.notna()
+    if retry.any():
+        dayfirst = bool(fmt) and fmt.startswith("%d")
+        ts[retry] = pd.to_datetime(
+            [_fallback_ts(x, dayfirst) for x in dt_str[retry]], errors="coerce")
+    return ts.dt.tz_localize(tz, ambiguous="NaT", nonexistent="NaT")
+
+_FIELDS = ("date", "time", "ampm", "name", "msg")
+
+def _record(fields: tuple | None, body: str) -> ChatLine:
+    """A message from its header fields (None: text before the first header) and
+    the text of its continuation lines (``""`` if it has none)."""
+    lines = body[:-1] if body.endswith("\n") else body
+    if fields is None:
+        return ChatLine(None, None, None, None, lines, True)
+    date, time, ampm, name, msg = fields
+    if body:
+        msg = msg + "\n" + lines
+    return ChatLine(date, time, ampm, name.strip() if name is not None else None, msg, name is None)
+
+def _iter_records(path: Path, start: int = 0, end: int | None = None) -> Iterator[ChatLine]:
+    """Messages in bytes ``[start, end)`` of the export (``start`` at a line start).
+
+    The file is memory-mapped and decoded in blocks; headers are found with one
+    regex scan per block and each message body is sliced once from its header
+    to the next, so a message with many continuation lines costs linear time.
+    Text before the first header becomes a system record.
+    """
+    with _mapped(path) as buf:
+        size = len(buf)
+        end = size if end is None else min(end, size)
+        if start < end < size and buf[end - 1] != 0x0A:
+            # a line that starts before ``end`` is read to its end
+            nl = buf.find(b"\n", end)
+            end = size if nl < 0 else nl + 1
+        fields, body = None, []  # the message being read and its continuation text
+        for text in _blocks(buf, start, end):
+            last = 0
+            for m in BLOCK_PATTERN.finditer(text):
+                body.append(text[last:m.start()])
+                if fields is not None or any(body):
+                    yield _record(fields, "".join(body))
+                fields, body = m.group(*_FIELDS), []
+                last = m.end() + 1  # past the header line's break
+            body.append(text[last:])
+        if fields is not None or any(body):
+            yield _record(fields, "".join(body))
+
+_LINK_HINT = re.compile(r"https?://|www\.")
+
+def _links(text: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Per message: number of URLs and their space-separated domains.
+
+    Only messages containing a URL prefix go through ``extractall``; both
+    alternatives of :data:`URL_PATTERN` are folded into one match column.
+    """
+    count = pd.Series(0, index=text.index)
+    domains = pd.Series("", index=text.index)
+    cand = text[text.str.contains(_LINK_HINT)]
+    if cand.empty:
+        return count, domains
+    found = cand.str.extractall(URL_PATTERN)
+    urls = found[0].fillna(found[1])
+    rows = urls.index.get_level_values(0)
+    count[:] = urls.groupby(rows).size().reindex(text.index, fill_value=0)
+    host = url_domains(urls)
+    host = host[host.str.len() > 0]
+    rows = host.index.get_level_values(0)
+    nth = host.groupby(rows).cumcount().to_numpy()
+    # join the k-th domain of every message at once; a string agg per group is far slower
+    for k in range(int(nth.max()) + 1 if len(nth) else 0):
+        part = host[nth == k].set_axis(rows[nth == k])
+        domains[part.index] = part if k == 0 else domains[part.index] + " " + part
+    return count, domains
+
+@lru_cache(maxsize=1)
+def _clock_strings() -> np.ndarray:
+    return np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)], dtype=object)
+
+def enrich(df: pd.DataFrame) -> pd.DataFrame:
+    """Add calendar, media and emoji columns to a frame of timestamp/sender/message/is_system.
+
+    Everything is computed with column operations; emoji are matched as whole
+    sequences (ZWJ families, skin tones, flags) rather than single code points,
+    and URLs are counted and reduced to their domains once here so summaries
+    only sum or split columns.
+    """
+    ts = df["timestamp"]
+    local = ts.dt.tz_localize(None).astype("datetime64[s]")
+    date = local.dt.normalize()
+    # "HH:MM:SS" looked up by second of the day; far cheaper than dt.strftime
+    secs = (local - date).dt.total_seconds()
+    clock = pd.Series(_clock_strings()[secs.fillna(0).to_numpy("int64")], index=df.index) \
+        .where(secs.notna().to_numpy())
+    text = df["message"].fillna("").str.strip()
+    # every emoji contains a non-ASCII code point, so plain ASCII messages are skipped
+    emjs = pd.Series([[]] * len(text), index=text.index, dtype=object)
+    has_uni = ~text.map(str.isascii).astype(bool)
+    if has_uni.any():  # the emoji table is only loaded when some message can contain emoji
+        emjs[has_uni] = text[has_uni].str.findall(emoji_pattern())
+    links, domains = _links(text)
+    out = pd.DataFrame({
+        "timestamp": ts,
+        "date": date,
+        "time": clock,
+        "weekday": ts.dt.day_name(),
+        "hour": ts.dt.hour,
+        "sender": df["sender"],
+        "message": text,
+        "is_system": df["is_system"].astype(bool),
+        "is_media": text.str.contains(MEDIA_PATTERN),
+        "emoji_list": emjs.str.join(""),
+        "emoji_count": emjs.str.len(),
+        "link_count": links,
+        "link_domains": domains,
+    }, index=df.index)
+    return compact_dtypes(out[COLUMNS])
+
+def _records_to_frame(records: list[ChatLine], fmt: str | None, tz) -> pd.DataFrame:
+    with instrument.stage("parse.timestamps", len(records)):
+        stamps = _parse_timestamps([r.date for r in records], [r.time for r in records],
+                                   [r.ampm for r in records], fmt, tz)
+    with instrument.stage("parse.enrich", len(records)):
+        return enrich(pd.DataFrame({
+            "timestamp": stamps,
+            "sender": [r.name for r in records],
+            "message": [r.msg for r in records],
+            "is_system": [r.is_system for r in records],
+        }))
+
+def _iter_batches(records: Iterable[ChatLine], fmt: str | None, tz,
+                  batch_size: int) -> Iterator[pd.DataFrame]:
+    batch: list[ChatLine] = []
+    # reading and line matching are interleaved in the generators, so they are
+    # timed together between batches rather than with a stage() block
+    t0 = time.perf_counter()
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            instrument.record("parse.read_match", time.perf_counter() - t0, len(batch))
+            yield _records_to_frame(batch, fmt, tz)
+            batch = []
+            t0 = time.perf_counter()
+    if batch:
+        instrument.record("parse.read_match", time.perf_counter() - t0, len(batch))
+        yield _records_to_frame(batch, fmt, tz)
+
+def iter_chat_batches(path: Path, timezone: str = "Asia/Kolkata",
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream a chat export as DataFrames of at most ``batch_size`` messages.
+
+    The file is memory-mapped and decoded a message at a time, so peak memory
+    is bounded by the batch size rather than the size of the export.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    with instrument.stage("parse.sniff"):
+        fmt = sniff_timestamp_format(_header_lines(path))
+    yield from _iter_batches(_iter_records(path), fmt, gettz(timezone), batch_size)
+
+def _empty_frame(timezone: str) -> pd.DataFrame:
+    """The parse of an export without messages: every column, typed, no rows."""
+    df = pd.DataFrame({c: pd.Series(dtype=DTYPES.get(c, object)) for c in COLUMNS})
+    df["timestamp"] = pd.Series(dtype=pd.DatetimeTZDtype("us", gettz(timezone)))
     return df
+
+def _concat(frames: list[pd.DataFrame], timezone: str) -> pd.DataFrame:
+    if not frames:
+        return _empty_frame(timezone)
+    with instrument.stage("parse.concat", sum(len(f) for f in frames)):
+        return compact_dtypes(pd.concat(frames, ignore_index=True))
+
+def _is_header(raw: bytes) -> bool:
+    first = raw.decode("utf-8", errors="ignore").splitlines()[:1]
+    return bool(first) and classify_line(first[0].replace("\u200e", "")) is not None
+
+def last_header_offset(path: Path, block: int = 1 << 16) -> int | None:
+    """Byte offset of the last line that starts a message, scanning backwards
+    from the end of the file. None if the file has no message headers."""
+    with open(path, "rb") as fh:
+        pos = path.stat().st_size
+        carry = b""
+        while pos > 0:
+            start = max(0, pos - block)
+            fh.seek(start)
+            data = fh.read(pos - start) + carry
+            lines = data.split(b"\n")
+            # the first piece may continue a line that began before this block
+            carry = lines.pop(0) if start > 0 else b""
+            off = start + len(data)
+            for line in reversed(lines):
+                off -= len(line)
+                if _is_header(line):
+                    return off
+                off -= 1
+            pos = start
+    return None
+
+def split_ranges(path: Path, parts: int) -> list[tuple[int, int]]:
+    """Split a file into up to ``parts`` byte ranges that each begin on a
+    message header, so no message is cut across ranges."""
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, "rb") as fh:
+        for i in range(1, parts):
+            target = max(size * i // parts, bounds[-1])
+            # step back one byte so a target already at a line start is kept
+            fh.seek(max(target - 1, 0))
+            fh.readline()
+            while True:
+                pos = fh.tell()
+                line = fh.readline()
+                if not line:
+                    pos = size
+                    break
+                if _is_header(line):
+                    break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def parse_range(path: Path, start: int, end: int | None, fmt: str | None,
+                timezone: str = "Asia/Kolkata", batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """Parse the messages in bytes ``[start, end)`` using a known timestamp format.
+
+    ``start`` must be at the beginning of a line; see :func:`split_ranges`.
+    """
+    return _concat(list(iter_range_batches(path, start, end, fmt, timezone, batch_size)), timezone)
+
+def iter_range_batches(path: Path, start: int, end: int | None, fmt: str | None,
+                       timezone: str = "Asia/Kolkata",
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream the messages in bytes ``[start, end)`` as batches (see :func:`parse_range`)."""
+    yield from _iter_batches(_iter_records(path, start, end), fmt, gettz(timezone), batch_size)
+
+def _parse_range(job: tuple) -> pd.DataFrame:
+    return parse_range(*job)
+
+def parse_chat_parallel(path: Path, timezone: str = "Asia/Kolkata", workers: int | None = None,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """Parse byte ranges of the export in a process pool.
+
+    The result is identical to :func:`parse_chat`: the timestamp format is
+    sniffed once up front and ranges are concatenated in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, max(1, path.stat().st_size // MIN_RANGE_BYTES))
+    if parts <= 1:
+        return _concat(list(iter_chat_batches(path, timezone, batch_size)), timezone)
+    with instrument.stage("parse.sniff"):
+        fmt = sniff_timestamp_format(_header_lines(path))
+    jobs = [(path, a, b, fmt, timezone, batch_size) for a, b in split_ranges(path, parts)]
+    # stages inside the workers are not reported; the pool is timed as a whole
+    with instrument.stage("parse.workers") as st, \
+            ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+        frames = list(ex.map(_parse_range, jobs))
+        st.rows = sum(len(f) for f in frames)
+    return _concat(frames, timezone)
+
+def parse_chat(path: Path, timezone: str = "Asia/Kolkata", workers: int = 1) -> pd.DataFrame:
+    if workers > 1:
+        return parse_chat_parallel(path, timezone, workers)
+    return _concat(list(iter_chat_batches(path, timezone)), timezone)
@@ -0,0 +1,68 @@
+"""The parse -> analyze -> visualize pipeline for one export, shared by ``full`` and ``batch``."""
+from __future__ import annotations
+from pathlib import Path
+import pandas as pd
+
+from . import instrument
+from .parser import parse_chat
+from .utils import ensure_dir, read_table, save_df
+
+def parse_export(path: Path, workers: int = 1) -> pd.DataFrame:
+    with instrument.stage("parse") as st:
+        df = parse_chat(path, workers=workers)
+        st.rows = len(df)
+    return df
+
+def load_table(path: Path, **filters) -> pd.DataFrame:
+    """Read a processed table; ``filters`` (since/until/senders) go to :func:`read_table`."""
+    with instrument.stage("read") as st:
+        df = read_table(path, **filters)
+        st.rows = len(df)
+    return df
+
+def write_index(df: pd.DataFrame, path: Path):
+    """Store the :class:`src.index.ChatIndex` of processed table ``path`` next to it."""
+    from .index import ChatIndex, index_path
+    with instrument.stage("index", len(df)):
+        ChatIndex.build(df).save(index_path(path))
+
+def write_table(df: pd.DataFrame, path: Path, partition: bool = False):
+    with instrument.stage("write", len(df)):
+        save_df(df, path, partition=partition)
+    write_index(df, path)
+
+def run_full(raw: Path, workdir: Path, workers: int = 1, charts: list[str] | None = None,
+             incremental: bool = False, plot_workers: int | None = None,
+             partition: bool = False, approx: int | None = None,
+             summaries: list[str] | None = None) -> dict:
+    """Process one export into ``workdir/data/processed`` and ``workdir/reports``.
+
+    With ``partition`` the processed table is a year/month partitioned dataset
+    directory (see :func:`src.utils.save_df`). ``summaries`` selects the CSVs
+    (the defaults if None); charts need the default ones.
+
+    Returns the output paths, the parsed row count, the basic stats and the
+    seconds spent per chart.
+    """
+    # imported here so that parse-only callers never load the analyzer or plotting code
+    from .analyzer import AnalysisResult, analyze
+    from .incremental import update_incremental
+    from .visuals import plot_all
+    proc = workdir / "data" / "processed" / (raw.stem + ".parquet")
+    reports = workdir / "reports"
+    ensure_dir(proc.parent); ensure_dir(reports)
+    if incremental:
+        with instrument.stage("incremental") as st:
+            df, aggregates = update_incremental(raw, proc, workers=workers, partition=partition,
+                                                  approx=approx, summaries=summaries)
+            st.rows = len(df)
+        write_index(df, proc)
+        analysis = AnalysisResult(aggregates)
+    else:
+        df = parse_export(raw, workers)
+        write_table(df, proc, partition)
+        analysis = analyze(df, summaries, approx=approx)
+    analysis.export(reports, summaries)
+    timings = plot_all(df, reports, analysis, charts=charts, workers=plot_workers)
+    return {"processed": proc, "reports": reports, "rows": len(df),
+            "stats": analysis.basic_stats(), "charts": timings}
@@ -0,0 +1,137 @@
+"""VADER sentiment of user messages, scoring each distinct text once.
+
+Chats repeat themselves ("ok", "lol", "😂"), so texts are deduplicated before
+scoring and only texts missing from the score cache go to VADER, in a process
+pool. :class:`ScoreCache` keeps compound scores on disk keyed by a 64-bit hash
+of the text, so reruns (and other chats) only score texts never seen before.
+
+    sentiment.configure(cache_dir=Path("data/cache/sentiment"), workers=4)
+    scores = sentiment.score_messages(messages)
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+import os
+import tempfile
+import uuid
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .utils import ensure_dir
+
+# VADER's usual compound-score thresholds
+POSITIVE, NEGATIVE = 0.05, -0.05
+
+_HASH_KEY = "wa-sentiment-v1."  # 16 bytes; changing it invalidates every cache
+_CHUNK = 5_000                  # texts per pool task
+_MAX_PARTS = 32                 # cache part files before they are compacted into one
+
+def text_hashes(texts) -> np.ndarray:
+    """Stable 64-bit hashes of ``texts`` (vectorized)."""
+    return pd.util.hash_array(np.asarray(texts, dtype=object), hash_key=_HASH_KEY, categorize=False)
+
+@lru_cache(maxsize=1)
+def _vader():
+    # imported on first use: vaderSentiment is only needed when sentiment is requested
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+def _score_chunk(texts: list[str]) -> list[float]:
+    polarity = _vader().polarity_scores
+    return [polarity(t)["compound"] for t in texts]
+
+def score_texts(texts: list[str], workers: int | None = 1) -> np.ndarray:
+    """VADER compound score of each text, chunks scored in ``workers`` processes."""
+    chunks = [texts[i:i + _CHUNK] for i in range(0, len(texts), _CHUNK)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        scores = [_score_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            scores = list(ex.map(_score_chunk, chunks))
+    return np.fromiter(chain.from_iterable(scores), dtype="float32", count=len(texts))
+
+class ScoreCache:
+    """Text hash -> compound score, in memory and (with ``path``) on disk.
+
+    The directory holds append-only parquet part files, one per batch of new
+    scores, so concurrent writers never touch the same file.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._scores: pd.Series | None = None
+
+    def _parts(self) -> list[Path]:
+        return sorted(self.path.glob("part-*.parquet")) if self.path and self.path.is_dir() else []
+
+    def _load(self) -> pd.Series:
+        if self._scores is None:
+            parts = self._parts()
+            frames = [pd.read_parquet(p) for p in parts]
+            df = pd.concat(frames) if frames else pd.DataFrame(
+                {"hash": np.empty(0, "uint64"), "compound": np.empty(0, "float32")})
+            scores = pd.Series(df["compound"].to_numpy("float32"), index=df["hash"].to_numpy("uint64"))
+            self._scores = scores[~scores.index.duplicated()]
+            if len(parts) > _MAX_PARTS:
+                self._write(self._scores)
+                for p in parts:
+                    p.unlink(missing_ok=True)
+        return self._scores
+
+    def _write(self, scores: pd.Series):
+        ensure_dir(self.path)
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".part-", suffix=".parquet")
+        os.close(fd)
+        try:
+            pd.DataFrame({"hash": scores.index.to_numpy("uint64"), "compound": scores.to_numpy()}) \
+                .to_parquet(tmp, index=False)
+            os.replace(tmp, self.path / f"part-{uuid.uuid4().hex}.parquet")
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Cached scores of ``hashes`` (NaN where missing)."""
+        return self._load().reindex(hashes).to_numpy("float32", copy=True)
+
+    def add(self, hashes: np.ndarray, scores: np.ndarray):
+        new = pd.Series(np.asarray(scores, dtype="float32"), index=np.asarray(hashes, dtype="uint64"))
+        new = new[~new.index.duplicated() & ~new.index.isin(self._load().index)]
+        if new.empty:
+            return
+        if self.path is not None:
+            self._write(new)
+        self._scores = pd.concat([self._scores, new])
+
+_settings = {"cache": ScoreCache(), "workers": 1}
+
+def configure(cache_dir: Path | None = None, workers: int | None = 1):
+    """Where scores are cached (``None``: this process only) and how many processes score."""
+    _settings["cache"] = ScoreCache(cache_dir)
+    _settings["workers"] = workers
+
+def score_messages(messages: pd.Series) -> pd.Series:
+    """Compound score per message (index of ``messages``; missing texts are dropped).
+
+    Pass the output of :func:`src.analyzer._clean_messages`.
+    """
+    texts = messages.dropna()
+    codes, uniques = pd.factorize(texts)
+    uniques = np.asarray(uniques, dtype=object)
+    cache = _settings["cache"]
+    with instrument.stage("sentiment.lookup", len(uniques)):
+        hashes = text_hashes(uniques)
+        scores = cache.lookup(hashes)
+        miss = np.isnan(scores)
+    if miss.any():
+        with instrument.stage("sentiment.score", int(miss.sum())):
+            scores[miss] = score_texts(uniques[miss].tolist(), _settings["workers"])
+        cache.add(hashes[miss], scores[miss])
+    return pd.Series(scores[codes], index=texts.index, name="compound")
@@ -0,0 +1,84 @@
+"""Bounded-memory heavy hitters for the word and emoji counts.
+
+:class:`SpaceSaving` keeps at most ``capacity`` items. Every reported count
+is an upper bound on the true count and exceeds it by at most that item's
+``error``; any item whose true count is above :attr:`SpaceSaving.bound` is
+guaranteed to be tracked, and ``bound <= total / capacity``. Summaries are
+mergeable, so chunks, batches and workers can each keep their own and be
+combined in any order.
+"""
+from __future__ import annotations
+from collections import Counter
+from heapq import nlargest
+from typing import Mapping
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.counts: dict = {}   # item -> upper bound on its count
+        self.errors: dict = {}   # item -> maximum overestimate
+        self.floor = 0           # upper bound on the count of any untracked item
+        self.total = 0           # number of observations summarized
+
+    @property
+    def bound(self) -> int:
+        """Largest possible true count of an item that is not reported."""
+        return self.floor
+
+    def update(self, other: "SpaceSaving | Mapping") -> "SpaceSaving":
+        """Merge another summary or exact counts (e.g. a chunk's ``Counter``) into this one."""
+        if isinstance(other, SpaceSaving):
+            o_counts, o_errors, o_floor, o_total = other.counts, other.errors, other.floor, other.total
+        else:
+            o_counts, o_errors, o_floor, o_total = other, {}, 0, sum(other.values())
+        if not o_counts and not o_floor:
+            return self
+        counts, errors = self.counts, self.errors
+        if o_floor:  # an item missing from the other side may have up to its floor there
+            for item in counts.keys() - o_counts.keys():
+                counts[item] += o_floor
+                errors[item] += o_floor
+        for item, n in o_counts.items():
+            if item in counts:
+                counts[item] += n
+                errors[item] += o_errors.get(item, 0)
+            else:
+                counts[item] = n + self.floor
+                errors[item] = o_errors.get(item, 0) + self.floor
+        self.floor += o_floor
+        self.total += o_total
+        if len(counts) > self.capacity:
+            keep = nlargest(self.capacity + 1, counts, key=counts.__getitem__)
+            self.floor = max(self.floor, counts[keep[-1]])
+            kept = set(keep[:-1])
+            # rebuilt in first-seen order so ties break like Counter.most_common
+            self.counts = {k: v for k, v in counts.items() if k in kept}
+            self.errors = {k: errors[k] for k in self.counts}
+        return self
+
+    def most_common(self, n: int | None = None) -> list[tuple]:
+        return Counter(self.counts).most_common(n)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, SpaceSaving) and self.capacity == other.capacity
+                and self.counts == other.counts and self.errors == other.errors
+                and self.floor == other.floor and self.total == other.total)
+
+    def __repr__(self) -> str:
+        return f"SpaceSaving(capacity={self.capacity}, items={len(self)}, bound={self.floor})"
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "floor": self.floor, "total": self.total,
+                "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SpaceSaving":
+        s = cls(d["capacity"])
+        s.floor, s.total = d["floor"], d["total"]
+        s.counts, s.errors = dict(d["counts"]), dict(d["errors"])
+        return s
@@ -0,0 +1,57 @@
+"""CSV summaries straight from the parse stream, without building the full table.
+
+Each parsed batch is folded into a :class:`~src.analyzer.ChatAggregates` and
+dropped, so the message text is never held beyond one batch. The accumulators
+still grow with the chat: one entry per session, per distinct reply delay and
+per day, sender and word (``approx`` caps words and emoji). Memory is bounded
+by the batch size plus those, not by the size of the export.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+
+from . import instrument, parser
+from .analyzer import AnalysisResult, ChatAggregates
+
+def _fold(batches, summaries, approx) -> ChatAggregates:
+    agg = ChatAggregates()
+    for batch in batches:
+        agg.update(ChatAggregates.from_frame(batch, summaries, approx))
+    return agg
+
+def _aggregate_range(job: tuple) -> ChatAggregates:
+    path, start, end, fmt, timezone, batch_size, summaries, approx = job
+    return _fold(parser.iter_range_batches(path, start, end, fmt, timezone, batch_size), summaries, approx)
+
+def aggregate_stream(path: Path, timezone: str = "Asia/Kolkata", summaries: list[str] | None = None,
+                     workers: int | None = 1, batch_size: int = parser.DEFAULT_BATCH_SIZE,
+                     approx: int | None = None) -> ChatAggregates:
+    """Aggregate an export batch by batch; equal to ``ChatAggregates.from_frame(parse_chat(path))``.
+
+    With ``workers > 1`` byte ranges are aggregated in a process pool and the
+    partial aggregates merged in file order. ``approx`` bounds the word and
+    emoji counts (see :mod:`src.sketch`).
+    """
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, max(1, path.stat().st_size // parser.MIN_RANGE_BYTES))
+    if parts <= 1:
+        return _fold(parser.iter_chat_batches(path, timezone, batch_size), summaries, approx)
+    with instrument.stage("parse.sniff"):
+        fmt = parser.sniff_timestamp_format(parser._header_lines(path))
+    jobs = [(path, a, b, fmt, timezone, batch_size, summaries, approx)
+            for a, b in parser.split_ranges(path, parts)]
+    with instrument.stage("stream.workers"), \
+            ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+        agg = ChatAggregates()
+        for part in ex.map(_aggregate_range, jobs):
+            agg.update(part)
+    return agg
+
+def summarize_stream(path: Path, outdir: Path, timezone: str = "Asia/Kolkata",
+                     summaries: list[str] | None = None, workers: int | None = 1,
+                     batch_size: int = parser.DEFAULT_BATCH_SIZE, approx: int | None = None) -> AnalysisResult:
+    """Write the same CSVs as :func:`src.analyzer.export_csv_summaries` one batch at a time."""
+    result = AnalysisResult(aggregate_stream(path, timezone, summaries, workers, batch_size, approx))
+    result.export(outdir, summaries)
+    return result
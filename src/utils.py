@@ -1,26 +1,248 @@
+from functools import lru_cache
 from pathlib import Path
+import os
 import re
 import pandas as pd
 
 URL_PATTERN = re.compile(r"(https?://\S+)|(www\.\S+)")
 
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Compact dtypes of a parsed chat frame: repeated labels as categoricals, small
+# ints, nullable booleans and Arrow-backed text.
+ARROW_STR = pd.StringDtype("pyarrow")
+DTYPES = {
+    "date": "datetime64[ms]",
+    "time": ARROW_STR,
+    "weekday": pd.CategoricalDtype(WEEKDAYS, ordered=True),
+    "hour": "Int8",
+    "sender": "category",
+    "message": ARROW_STR,
+    "is_system": "boolean",
+    "is_media": "boolean",
+    "emoji_list": ARROW_STR,
+    "emoji_count": "int32",
+    "link_count": "int32",
+    "link_domains": ARROW_STR,
+}
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the columns of a parsed chat frame to :data:`DTYPES` (missing columns are skipped)."""
+    casts = {c: t for c, t in DTYPES.items() if c in df.columns and df[c].dtype != t}
+    if not casts:
+        return df
+    df = df.copy()
+    for col, dtype in casts.items():
+        if col == "date" and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        if col == "sender":
+            # re-derive categories so frames concatenated from batches share one set
+            df[col] = df[col].astype(object).astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
-def save_df(df: pd.DataFrame, path: Path):
+# Parquet layout: time-ordered row groups let date filters skip whole groups;
+# low-cardinality columns are dictionary encoded (message text is not, its
+# dictionary would only overflow).
+ROW_GROUP_SIZE = 128_000
+DICT_COLUMNS = ["sender", "weekday", "time", "emoji_list", "link_domains"]
+PARTITION_COLS = ["year", "month"]
+
+def _write_dataset(df: pd.DataFrame, root: Path):
+    """Write a Hive-partitioned dataset ``root/year=YYYY/month=M/part-0.parquet``."""
+    import shutil
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    # _row keeps file order: fragments are read back in path order (month=10 before month=2)
+    part = df.assign(_row=range(len(df)), year=df["date"].dt.year.astype("Int16"),
+                     month=df["date"].dt.month.astype("Int8"))
+    table = pa.Table.from_pandas(part, preserve_index=False)
+    fmt = ds.ParquetFileFormat()
+    tmp = root.with_name(f".{root.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    ds.write_dataset(
+        table, tmp, format=fmt,
+        file_options=fmt.make_write_options(use_dictionary=DICT_COLUMNS),
+        partitioning=ds.partitioning(table.select(PARTITION_COLS).schema, flavor="hive"),
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=ROW_GROUP_SIZE, min_rows_per_group=min(ROW_GROUP_SIZE, 16_384),
+    )
+    # swap in the new tree so months that disappeared from the chat do not linger
+    if root.exists():
+        shutil.rmtree(root) if root.is_dir() else root.unlink()
+    os.replace(tmp, root)
+
+def save_df(df: pd.DataFrame, path: Path, partition: bool = False):
+    """Write a parsed frame. ``partition=True`` (or an existing dataset directory at
+    ``path``) writes a Hive-partitioned Parquet dataset by year/month instead of one file."""
     ensure_dir(path.parent)
-    if path.suffix.lower() == ".parquet":
-        df.to_parquet(path, index=False)
+    df = compact_dtypes(df)
+    if partition or path.is_dir():
+        _write_dataset(df, path)
+    elif path.suffix.lower() == ".parquet":
+        df.to_parquet(path, index=False, row_group_size=ROW_GROUP_SIZE, use_dictionary=DICT_COLUMNS)
     elif path.suffix.lower() in (".csv", ".txt"):
         df.to_csv(path, index=False)
     else:
-        df.to_parquet(path.with_suffix(".parquet"), index=False)
+        df.to_parquet(path.with_suffix(".parquet"), index=False,
+                      row_group_size=ROW_GROUP_SIZE, use_dictionary=DICT_COLUMNS)
+
+def _day(value) -> pd.Timestamp:
+    return pd.Timestamp(value).normalize()
+
+def _parquet_filter(since, until, senders, partitioned: bool):
+    """pyarrow expression for the row filters; on a partitioned dataset the
+    year/month predicates prune whole directories before any file is opened."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    date, year, month = ds.field("date"), ds.field("year"), ds.field("month")
+    ym = year.cast(pa.int32()) * 12 + month.cast(pa.int32())
+    conds = []
+    if since is not None:
+        since = _day(since)
+        conds.append(date >= pa.scalar(since.to_pydatetime(), pa.timestamp("ms")))
+        if partitioned:
+            conds.append(ym >= since.year * 12 + since.month)
+    if until is not None:
+        until = _day(until)
+        conds.append(date <= pa.scalar(until.to_pydatetime(), pa.timestamp("ms")))
+        if partitioned:
+            conds.append(ym <= until.year * 12 + until.month)
+    if senders:
+        conds.append(ds.field("sender").isin(list(senders)))
+    expr = None
+    for c in conds:
+        expr = c if expr is None else expr & c
+    return expr
+
+def _csv_timestamps(text: pd.Series) -> pd.Series:
+    """Timestamps written to CSV as text, back as tz-aware datetimes (UTC when
+    the offsets differ, e.g. across a DST change)."""
+    try:
+        return pd.to_datetime(text, format="ISO8601")
+    except ValueError:
+        return pd.to_datetime(text, format="ISO8601", utc=True)
+
+# columns added by a later parser version; tables written before it get them
+# computed from the message text on read
+LINK_COLUMNS = ["link_count", "link_domains"]
 
-def read_table(path: Path) -> pd.DataFrame:
+def _table_columns(path: Path) -> list[str]:
+    if path.is_dir() or path.suffix.lower() == ".parquet":
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format="parquet", partitioning="hive" if path.is_dir() else None).schema.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+def read_table(path: Path, since=None, until=None, senders: list[str] | None = None,
+               columns: list[str] | None = None) -> pd.DataFrame:
+    """Load a processed table (Parquet file, partitioned dataset directory or CSV).
+
+    ``since``/``until`` (inclusive dates) and ``senders`` are pushed down to
+    pyarrow for Parquet, so only matching partitions and row groups are read.
+    ``columns`` limits which columns are read at all (filters still work on
+    columns that are not loaded). :data:`LINK_COLUMNS` missing from an older
+    table are derived from ``message``.
+    """
+    have = _table_columns(path)
+    missing = [c for c in LINK_COLUMNS if c not in have and (columns is None or c in columns)]
+    if not missing:
+        return _read_table(path, since, until, senders, columns)
+    if "message" not in have:
+        raise ValueError(f"{path} has no {', '.join(missing)} column; re-parse the export")
+    read = None if columns is None else \
+        [*(c for c in columns if c not in missing and c != "message"), "message"]
+    df = _read_table(path, since, until, senders, read)
+    from .parser import _links  # the parser imports this module
+    count, domains = _links(df["message"].fillna(""))
+    df = df.assign(**dict(zip(LINK_COLUMNS, (count, domains))))
+    if columns is not None:
+        df = df[[c for c in df.columns if c in columns]]
+    return compact_dtypes(df)
+
+def _read_table(path: Path, since, until, senders, columns) -> pd.DataFrame:
     s = path.suffix.lower()
-    if s == ".parquet":
-        return pd.read_parquet(path)
-    return pd.read_csv(path)
+    if path.is_dir() or s == ".parquet":
+        import pyarrow.dataset as ds
+        partitioned = path.is_dir()
+        dset = ds.dataset(path, format="parquet", partitioning="hive" if partitioned else None)
+        if columns is not None and partitioned:
+            columns = [*columns, "_row"]
+        table = dset.to_table(columns=columns, filter=_parquet_filter(since, until, senders, partitioned))
+        df = table.to_pandas()
+        if partitioned:
+            df = df.sort_values("_row", kind="stable", ignore_index=True)
+        return compact_dtypes(df.drop(columns=[c for c in ["_row", *PARTITION_COLS] if c in df.columns]))
+    usecols = None
+    if columns is not None:
+        # filter columns are needed to apply the filters, then dropped again
+        usecols = set(columns) | ({"date"} if since is not None or until is not None else set()) \
+            | ({"sender"} if senders else set())
+    df = compact_dtypes(pd.read_csv(path, usecols=usecols))
+    if "timestamp" in df.columns:
+        df["timestamp"] = _csv_timestamps(df["timestamp"])
+    if since is not None:
+        df = df[df["date"] >= _day(since)]
+    if until is not None:
+        df = df[df["date"] <= _day(until)]
+    if senders:
+        df = df[df["sender"].isin(senders)]
+    if columns is not None:
+        df = df[[c for c in df.columns if c in columns]]
+    return df.reset_index(drop=True)
 
 def extract_urls(text: str) -> list[str]:
     return [m.group(0) for m in URL_PATTERN.finditer(text or "")]
+
+def url_domains(urls: pd.Series) -> pd.Series:
+    """Lower-cased host of each URL matched by :data:`URL_PATTERN`, without ``www.``."""
+    host = urls.str.lower().str.replace(r"^(?:https?://)?(?:www\.)?", "", regex=True)
+    return host.str.extract(r"^([^/?#:\s]*)", expand=False).str.rstrip(".,;!?)]}>'\"")
+
+def _char_class(chars) -> str:
+    """Regex char class for ``chars`` with consecutive code points merged into ranges."""
+    runs: list[list[int]] = []
+    for cp in sorted({ord(c) for c in chars}):
+        if runs and cp == runs[-1][1] + 1:
+            runs[-1][1] = cp
+        else:
+            runs.append([cp, cp])
+    if len(runs) == 1 and runs[0][0] == runs[0][1]:
+        return re.escape(chr(runs[0][0]))
+    return "[" + "".join(re.escape(chr(a)) if a == b else f"{re.escape(chr(a))}-{re.escape(chr(b))}"
+                         for a, b in runs) + "]"
+
+def _trie_pattern(words) -> str:
+    """Regex matching any of ``words``, longest first, built as a prefix trie so
+    the engine never tries thousands of alternatives at one position."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        leaves = [ch for ch, child in node.items() if ch and not child.keys() - {""}]
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items())
+                    if ch and child.keys() - {""}]
+        if leaves:
+            branches.append(_char_class(leaves))
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?" if len(branches) == 1 else body + "?"
+        return body
+
+    return render(trie)
+
+@lru_cache(maxsize=1)
+def emoji_pattern() -> re.Pattern:
+    """Compiled regex matching whole emoji, including ZWJ sequences, skin tones and flags."""
+    import emoji
+    keys = emoji.EMOJI_DATA.keys()
+    # cheap first-character lookahead lets plain text positions fail fast
+    first = _char_class({k[0] for k in keys})
+    return re.compile(f"(?={first}){_trie_pattern(keys)}")
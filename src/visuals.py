@@ -1,34 +1,38 @@
+from __future__ import annotations
 from pathlib import Path
-import matplotlib.pyplot as plt
-import matplotlib
-import pandas as pd
-from wordcloud import WordCloud
+from typing import TYPE_CHECKING
+import os
+import tempfile
+import time
 
-from .analyzer import (
-    messages_per_sender, daily_timeline, hourly_timeline,
-    weekday_hour_heatmap, top_words, emoji_freq, _clean_messages
-)
-from .utils import ensure_dir
+from . import instrument
+
+# matplotlib, pandas and the analyzer are imported where they are used, so the
+# CLI can read CHARTS (for --charts) without loading the plotting stack
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    import pandas as pd
+    from .analyzer import AnalysisResult
 
 PURPLE = "#7C3AED"
 FG     = "#EAEAF2"
 BG     = "#0B0B10"
 
-def _set_theme():
-    plt.rcParams.update({
-        "axes.facecolor": BG,
-        "figure.facecolor": BG,
-        "axes.edgecolor": FG,
-        "axes.labelcolor": FG,
-        "xtick.color": FG,
-        "ytick.color": FG,
-        "text.color": FG,
-        "axes.titleweight": "bold",
-        "grid.alpha": 0.25
-    })
-
-def _set_emoji_font():
-    """Try to use an emoji-capable font so emoji labels render correctly."""
+THEME = {
+    "axes.facecolor": BG,
+    "figure.facecolor": BG,
+    "axes.edgecolor": FG,
+    "axes.labelcolor": FG,
+    "xtick.color": FG,
+    "ytick.color": FG,
+    "text.color": FG,
+    "axes.titleweight": "bold",
+    "grid.alpha": 0.25
+}
+
+def _emoji_font_family() -> str | None:
+    """Try to find an emoji-capable font so emoji labels render correctly."""
+    import matplotlib.font_manager
     candidates = [
         "Segoe UI Emoji",       # Windows
         "Noto Color Emoji",     # Linux
@@ -38,85 +42,193 @@ def _set_emoji_font():
     for fam in candidates:
         try:
             matplotlib.font_manager.findfont(fam, fallback_to_default=False)
-            plt.rcParams["font.family"] = fam
             return fam
         except Exception:
             continue
     return None
 
-def _save(path: Path, title: str):
-    plt.title(title)
-    plt.grid(True, linestyle=":")
-    plt.tight_layout()
-    plt.savefig(path, dpi=160, facecolor=BG)
-    plt.close()
-
-def plot_all(df: pd.DataFrame, outdir: Path):
-    ensure_dir(outdir)
-    _set_theme()
-    _set_emoji_font()
-
-    # 1) Messages per sender
-    mps = messages_per_sender(df).head(15)
-    plt.figure()
-    plt.barh(mps["sender"], mps["message_count"], color=PURPLE)
-    plt.gca().invert_yaxis()
-    _save(outdir / "chart_messages_per_sender.png", "Messages per Sender")
-
-    # 2) Daily timeline
-    tl = daily_timeline(df)
-    plt.figure()
-    plt.plot(pd.to_datetime(tl["date"]), tl["messages"], linewidth=2, color=PURPLE)
-    plt.xticks(rotation=45, ha="right")
-    _save(outdir / "chart_daily_timeline.png", "Daily Message Timeline")
-
-    # 3) Hourly distribution
-    ha = hourly_timeline(df)
-    plt.figure()
-    plt.bar(ha["hour"], ha["messages"], color=PURPLE)
-    plt.xticks(range(0, 24, 1))
-    _save(outdir / "chart_hourly_timeline.png", "Hourly Message Distribution")
-
-    # 4) Weekday x Hour heatmap
-    hm = weekday_hour_heatmap(df)
-    plt.figure()
-    im = plt.imshow(hm.values, aspect="auto", cmap="magma")
-    plt.yticks(ticks=range(7), labels=hm.index.tolist())
-    plt.xticks(ticks=range(0,24,1), labels=list(range(0,24,1)))
-    plt.colorbar(im, label="Messages")
-    _save(outdir / "chart_weekday_hour_heatmap.png", "Activity Heatmap (Weekday × Hour)")
-
-    # 5) WordCloud (built ONLY from clean messages; excludes <Media omitted>)
-    clean_msgs = _clean_messages(df)
-    # Build a weighted text using the same filtering as top_words (keeps results consistent)
-    tw = top_words(df, 200)
-    wc_text = " ".join([(w + " ") * c for w, c in tw.values])
-
-    # Choose an emoji-capable font if available; otherwise default
-    font_path = None
+def _emoji_font_path() -> str | None:
     for candidate in [
         "C:/Windows/Fonts/seguiemj.ttf",                 # Segoe UI Emoji (Windows)
         "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
         "/System/Library/Fonts/Apple Color Emoji.ttc",
     ]:
         if Path(candidate).exists():
-            font_path = candidate
-            break
+            return candidate
+    return None
 
+# Each chart draws onto its own Figure (no shared pyplot state), so charts can
+# be rendered in separate processes. ``data`` is the summary frame it plots.
+
+def _draw_messages_per_sender(fig: Figure, mps: pd.DataFrame):
+    ax = fig.subplots()
+    ax.barh(mps["sender"], mps["message_count"], color=PURPLE)
+    ax.invert_yaxis()
+    return ax
+
+def _draw_daily_timeline(fig: Figure, tl: pd.DataFrame):
+    import pandas as pd
+    ax = fig.subplots()
+    ax.plot(pd.to_datetime(tl["date"]), tl["messages"], linewidth=2, color=PURPLE)
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    return ax
+
+def _draw_hourly_timeline(fig: Figure, ha: pd.DataFrame):
+    ax = fig.subplots()
+    ax.bar(ha["hour"], ha["messages"], color=PURPLE)
+    ax.set_xticks(range(0, 24, 1))
+    return ax
+
+def _draw_weekday_hour_heatmap(fig: Figure, hm: pd.DataFrame):
+    ax = fig.subplots()
+    im = ax.imshow(hm.values, aspect="auto", cmap="magma")
+    ax.set_yticks(range(7), labels=hm.index.tolist())
+    ax.set_xticks(range(0, 24, 1), labels=list(range(0, 24, 1)))
+    fig.colorbar(im, ax=ax, label="Messages")
+    return ax
+
+def _draw_wordcloud(fig: Figure, tw: pd.DataFrame):
+    from wordcloud import WordCloud
+    # Build a weighted text using the same filtering as top_words (keeps results consistent)
+    wc_text = " ".join([(w + " ") * c for w, c in tw[["word", "count"]].values])
     wc = WordCloud(
         width=1400, height=700, background_color=BG,
         colormap="magma", prefer_horizontal=0.9,
-        font_path=font_path
+        font_path=_emoji_font_path()
     ).generate(wc_text if wc_text.strip() else "chat")
+    ax = fig.subplots()
+    ax.imshow(wc, interpolation="bilinear")
+    ax.axis("off")
+    return ax
+
+def _draw_emoji_top(fig: Figure, ef: pd.DataFrame):
+    ax = fig.subplots()
+    ax.barh(ef["emoji"], ef["count"], color=PURPLE)
+    ax.invert_yaxis()
+    return ax
+
+def _draw_reply_times(fig: Figure, rt: pd.DataFrame):
+    import numpy as np
+    ax = fig.subplots()
+    y = np.arange(len(rt))
+    ax.barh(y - 0.2, rt["median_seconds"] / 60, height=0.4, color=PURPLE, label="median")
+    ax.barh(y + 0.2, rt["p90_seconds"] / 60, height=0.4, color=FG, alpha=0.6, label="p90")
+    ax.set_yticks(y, labels=rt["sender"].tolist())
+    ax.invert_yaxis()
+    ax.set_xlabel("Reply time (minutes)")
+    ax.legend()
+    return ax
+
+def _draw_reply_matrix(fig: Figure, rm: pd.DataFrame):
+    ax = fig.subplots()
+    im = ax.imshow(rm.values, aspect="auto", cmap="magma")
+    ax.set_yticks(range(len(rm)), labels=rm.index.tolist())
+    ax.set_xticks(range(len(rm.columns)), labels=rm.columns.tolist(), rotation=45, ha="right")
+    ax.set_ylabel("Message from")
+    ax.set_xlabel("Replied by")
+    fig.colorbar(im, ax=ax, label="Replies")
+    return ax
+
+def _draw_session_lengths(fig: Figure, se: pd.DataFrame):
+    ax = fig.subplots()
+    ax.hist(se["duration_minutes"], bins=40, color=PURPLE)
+    ax.set_xlabel("Session length (minutes)")
+    ax.set_ylabel("Sessions")
+    return ax
+
+def _top_repliers(rm: pd.DataFrame, n: int = 15) -> pd.DataFrame:
+    keep = (rm.sum(axis=0) + rm.sum(axis=1)).nlargest(n).index
+    return rm.loc[keep, keep]
+
+# name -> (title, draw function, summary getter, figsize)
+CHARTS = {
+    "messages_per_sender": ("Messages per Sender", _draw_messages_per_sender,
+                            lambda a: a.messages_per_sender().head(15), None),
+    "daily_timeline": ("Daily Message Timeline", _draw_daily_timeline,
+                       lambda a: a.daily_timeline(), None),
+    "hourly_timeline": ("Hourly Message Distribution", _draw_hourly_timeline,
+                        lambda a: a.hourly_timeline(), None),
+    "weekday_hour_heatmap": ("Activity Heatmap (Weekday × Hour)", _draw_weekday_hour_heatmap,
+                             lambda a: a.weekday_hour_heatmap(), None),
+    # built ONLY from clean messages; excludes <Media omitted>
+    "wordcloud": ("Word Cloud (Top Words)", _draw_wordcloud, lambda a: a.top_words(200), (10, 5)),
+    "emoji_top": ("Top Emojis", _draw_emoji_top, lambda a: a.emoji_freq(25), None),
+    "reply_times": ("Reply Time per Sender", _draw_reply_times, lambda a: a.reply_times().head(15), None),
+    "reply_matrix": ("Who Replies to Whom", _draw_reply_matrix,
+                     lambda a: _top_repliers(a.reply_matrix()), None),
+    "session_lengths": ("Conversation Session Lengths", _draw_session_lengths, lambda a: a.sessions(), None),
+}
+
+# chart -> the summary it draws (see src.analyzer.SUMMARIES), for column projection
+CHART_SUMMARY = {
+    "messages_per_sender": "messages_per_sender",
+    "daily_timeline": "daily_timeline",
+    "hourly_timeline": "hourly_timeline",
+    "weekday_hour_heatmap": "weekday_hour_heatmap",
+    "wordcloud": "top_words",
+    "emoji_top": "emoji_freq",
+    "reply_times": "reply_times",
+    "reply_matrix": "reply_matrix",
+    "session_lengths": "sessions",
+}
+
+def chart_path(outdir: Path, name: str) -> Path:
+    return outdir / f"chart_{name}.png"
+
+def _render(job: tuple) -> float:
+    """Draw one chart and write it atomically; returns the seconds it took."""
+    import matplotlib
+    from matplotlib.figure import Figure
+    name, data, path, font = job
+    t0 = time.perf_counter()
+    title, draw, _, figsize = CHARTS[name]
+    rc = dict(THEME, **({"font.family": font} if font else {}))
+    with matplotlib.rc_context(rc):
+        fig = Figure(figsize=figsize)
+        ax = draw(fig, data)
+        ax.set_title(title)
+        ax.grid(True, linestyle=":")
+        fig.tight_layout()
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".png")
+        os.close(fd)
+        try:
+            fig.savefig(tmp, dpi=160, facecolor=BG)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return time.perf_counter() - t0
+
+def plot_all(df: pd.DataFrame, outdir: Path, analysis: AnalysisResult | None = None,
+             charts: list[str] | None = None, workers: int | None = None) -> dict[str, float]:
+    """Render charts (all of :data:`CHARTS` by default) and return seconds per chart.
+
+    Summaries are computed once up front (pass ``analysis`` to reuse them); the
+    charts themselves are drawn in a process pool of ``workers`` processes.
+    """
+    names = list(CHARTS) if charts is None else list(charts)
+    unknown = [n for n in names if n not in CHARTS]
+    if unknown:
+        raise ValueError(f"unknown chart(s): {', '.join(unknown)}; choose from {', '.join(CHARTS)}")
+    from .analyzer import analyze
+    from .utils import ensure_dir
+    if analysis is None:
+        analysis = analyze(df)
+    ensure_dir(outdir)
+    font = _emoji_font_family()
+    jobs = [(n, CHARTS[n][2](analysis), chart_path(outdir, n), font) for n in names]
 
-    plt.figure(figsize=(10,5))
-    plt.imshow(wc, interpolation="bilinear")
-    plt.axis("off")
-    _save(outdir / "chart_wordcloud.png", "Word Cloud (Top Words)")
-
-    # 6) Emoji frequency
-    ef = emoji_freq(df, 25)
-    plt.figure()
-    plt.barh(ef["emoji"], ef["count"], color=PURPLE)
-    plt.gca().invert_yaxis()
-    _save(outdir / "chart_emoji_top.png", "Top Emojis")
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with instrument.stage("plot.all", len(jobs)):
+        if workers <= 1:
+            timings = [_render(j) for j in jobs]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                timings = list(ex.map(_render, jobs))
+    # per-chart times come back from the workers; report them as stages too
+    for name, secs in zip(names, timings):
+        instrument.record(f"plot.{name}", secs)
+    return dict(zip(names, timings))
@@ -0,0 +1,95 @@
+import pandas as pd
+from src import analyzer
+from src.analyzer import ChatAggregates, analyze, reply_times
+from src.parser import parse_chat
+from benchmarks.synth import generate_export
+
+def _chat(tmp_path, n=3000):
+    return parse_chat(generate_export(tmp_path / "chat.txt", n, multiline=0.2))
+
+def test_analysis_result_matches_per_summary_functions(tmp_path):
+    df = _chat(tmp_path)
+    res = analyze(df)
+    assert res.basic_stats() == analyzer.basic_stats(df)
+    for name in ("messages_per_sender", "daily_timeline", "hourly_timeline", "top_words", "emoji_freq",
+                 "top_domains", "reply_times", "sessions"):
+        # the frame-based version keeps the categorical sender dtype
+        got, expected = getattr(res, name)(), getattr(analyzer, name)(df)
+        if "sender" in expected:
+            expected["sender"] = expected["sender"].astype(str)
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, obj=name)
+    for name in ("weekday_hour_heatmap", "reply_matrix"):
+        pd.testing.assert_frame_equal(getattr(res, name)(), getattr(analyzer, name)(df),
+                                      check_dtype=False, check_names=False, obj=name)
+    assert res.top_words(10) is res.top_words(10)
+
+def test_aggregates_merge_in_order(tmp_path):
+    df = _chat(tmp_path)
+    merged = ChatAggregates()
+    for i in range(0, len(df), 500):
+        merged = merged.merge(ChatAggregates.from_frame(df.iloc[i:i + 500]))
+    assert merged == ChatAggregates.from_frame(df)
+
+def test_word_counter_matches_per_token_loop():
+    from benchmarks.bench_top_words import legacy_word_counter, synthetic_messages
+    msgs = pd.concat([synthetic_messages(2000),
+                      pd.Series(["Don't STOP me_now!! 2024 İstanbul ½ naïve", "the a I", "", "ok OK"])])
+    got = analyzer._word_counter(msgs)
+    assert list(got.items()) == list(legacy_word_counter(msgs).items())
+
+def test_projected_frames_give_the_same_summaries(tmp_path):
+    df = _chat(tmp_path)
+    full = analyze(df, list(analyzer.SUMMARIES))
+    assert "message" not in analyzer.columns_for(["messages_per_sender", "daily_timeline",
+                                                  "hourly_timeline", "weekday_hour_heatmap"])
+    assert analyzer.columns_for(["emoji_freq"]) == ["emoji_list"]
+    assert analyzer.columns_for(["daily_timeline"]) == ["date"]
+    for name in analyzer.SUMMARIES:
+        part = analyze(df[analyzer.columns_for([name])], [name])
+        pd.testing.assert_frame_equal(part.summary(name), full.summary(name), obj=name)
+
+def test_link_columns_match_regex_scan(tmp_path):
+    from src.parser import enrich
+    from src.utils import extract_urls
+    df = _chat(tmp_path)
+    df.loc[0, "message"] = "docs at https://WWW.Example.com/x?y=1, mirror www.example.com and http://a.io:8080/"
+    df = enrich(df.drop(columns=["link_count", "link_domains"]))
+    assert df["link_count"].tolist() == [len(extract_urls(t)) for t in df["message"]]
+    assert df.loc[0, "link_domains"] == "example.com example.com a.io"
+    res = analyze(df)
+    assert res.basic_stats()["links_shared"] == int(df.loc[~df["is_system"], "link_count"].sum()) > 3
+    domains = df.loc[~df["is_system"], "link_domains"].str.split().explode().dropna()
+    pd.testing.assert_series_equal(res.top_domains(5).set_index("domain")["count"],
+                                   domains.value_counts().head(5), check_names=False, check_dtype=False,
+                                   check_index_type=False)
+
+def test_replies_and_sessions(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text("\n".join([
+        "1/3/24, 10:00 - Alice: hi",
+        "1/3/24, 10:02 - Bob: hey",       # Bob replies to Alice after 2 min
+        "1/3/24, 10:03 - Bob: how are you",
+        "1/3/24, 10:13 - Alice: good",    # Alice replies to Bob after 10 min
+        "1/3/24, 10:14 - Messages and calls are end-to-end encrypted",
+        "1/3/24, 12:00 - Bob: lunch?",    # new session; still Bob's reply, after 107 min
+        "1/3/24, 12:01 - Carol: yes",
+        "1/3/24, 15:10:59 - Carol: ok",
+        "1/3/24, 15:51:30 - Alice: late", # a reply after 2431 s, across a session gap
+        "3/3/24, 9:00 - Bob: back",       # more than a day later: not a reply
+    ]), encoding="utf-8")
+    df = parse_chat(chat)
+    res = analyze(df, ["reply_times", "reply_matrix", "sessions"])
+    rt = res.reply_times().set_index("sender")
+    assert rt["replies"].to_dict() == {"Alice": 2, "Bob": 2, "Carol": 1}
+    assert rt.loc["Alice", "p90_seconds"] == 600 + 0.9 * 1831
+    assert rt.loc["Bob", "median_seconds"] == (120 + 6420) / 2
+    pd.testing.assert_frame_equal(res.reply_times(), reply_times(df), check_dtype=False)
+    assert res.reply_matrix().loc["Bob"].tolist() == [1, 0, 1]
+    se = res.sessions()
+    assert se["messages"].tolist() == [4, 2, 1, 1, 1] and se["duration_minutes"].tolist()[:2] == [13, 1]
+    assert str(se.loc[1, "start"]) == "2024-01-03 12:00:00"
+    # a reply or session split between slices is joined again on merge
+    whole = ChatAggregates.from_frame(df)
+    for k in range(1, len(df)):
+        assert ChatAggregates.from_frame(df.iloc[:k]).merge(ChatAggregates.from_frame(df.iloc[k:])) == whole
+    assert ChatAggregates.from_dict(whole.to_dict()) == whole
@@ -0,0 +1,26 @@
+import json
+import pandas as pd
+from benchmarks.synth import generate_export
+from src.batch import MANIFEST_FILE, SUMMARY_FILE, find_exports, run_batch
+
+def test_batch_isolates_failures(tmp_path):
+    src = tmp_path / "exports"
+    generate_export(src / "small.txt", 200, seed=1)
+    generate_export(src / "big.txt", 600, "ios", seed=2)
+    bad = src / "broken.txt"
+    bad.mkdir(parents=True)  # a directory is not picked up by the directory scan ...
+    paths = find_exports(str(src)) + [bad]  # ... so pass it explicitly to force a failure
+
+    out = tmp_path / "out"
+    entries = run_batch(paths, out, workers=2, charts=["hourly_timeline"])
+    assert [e["status"] for e in entries] == ["ok", "ok", "error"]  # largest first, failure last
+    assert entries[0]["input"].endswith("big.txt")
+    for name in ("big", "small"):
+        assert (out / name / "reports" / "summary_overall.csv").exists()
+        assert (out / name / "reports" / "chart_hourly_timeline.png").exists()
+
+    summary = pd.read_csv(out / SUMMARY_FILE)
+    assert summary["chat"].tolist() == ["big", "small"]
+    manifest = json.loads((out / MANIFEST_FILE).read_text())
+    assert manifest["ok"] == 2 and manifest["failed"] == 1
+    assert "parse" in manifest["chats"][0]["stages"]
@@ -0,0 +1,46 @@
+import pytest
+from benchmarks.run import compare
+from benchmarks.synth import generate_export
+from src.parser import parse_chat
+
+@pytest.mark.parametrize("fmt", ["android", "ios"])
+@pytest.mark.parametrize("clock", ["24h", "12h"])
+def test_synthetic_exports_parse(tmp_path, fmt, clock):
+    path = generate_export(tmp_path / "chat.txt", 400, fmt, clock=clock, media=0.2, system=0.1, emoji=0.5)
+    df = parse_chat(path)
+    assert df["timestamp"].notna().all()
+    assert df["is_system"].any() and df["is_media"].any() and df["emoji_count"].sum() > 0
+    assert df["message"].str.contains("\n").any()  # continuation lines were folded in
+
+def _report(throughput, rss):
+    stage = {"seconds": 1.0, "throughput": throughput, "peak_rss_mb": rss}
+    return {"runs": [{"fmt": "android", "clock": "24h", "lines": 10, "stages": {"parse_chat": stage}}]}
+
+def test_compare_flags_regressions():
+    base = _report(1000.0, 100.0)
+    assert compare(_report(900.0, 110.0), base, 0.25) == []
+    problems = compare(_report(500.0, 200.0), base, 0.25)
+    assert len(problems) == 2 and "throughput" in problems[0] and "RSS" in problems[1]
+
+def test_large_exports_stay_within_max_span(tmp_path, monkeypatch):
+    from datetime import timedelta
+    from benchmarks import synth
+    # long enough for the day-first dates to be unambiguous
+    monkeypatch.setattr(synth, "MAX_SPAN", timedelta(days=20))
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 20_000, "ios"))
+    ts = df["timestamp"]
+    assert ts.is_monotonic_increasing
+    assert timedelta(days=15) < ts.iloc[-1] - ts.iloc[0] < timedelta(days=25)
+
+def test_suite_times_every_summary():
+    from benchmarks.run import ANALYZER_STAGES
+    from src.analyzer import SUMMARIES
+    assert len(ANALYZER_STAGES) == len(SUMMARIES)
+    assert {"top_domains", "reply_times", "sessions"} <= set(ANALYZER_STAGES)
+
+def test_suite_records_worker_scaling(monkeypatch):
+    from benchmarks.run import run_suite
+    from src import parser
+    monkeypatch.setattr(parser, "MIN_RANGE_BYTES", 1024)
+    stages = run_suite(2000, plots=False, workers=[2])["stages"]
+    assert stages["parse_chat.workers2"]["speedup"] > 0
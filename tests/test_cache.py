@@ -0,0 +1,28 @@
+import src.cache as cache
+from src.cache import ParseCache
+
+CHAT = "12/10/2024, 10:15 - Alice: Hello\n12/10/2024, 10:16 - Bob: Hi!\n".encode()
+
+def _count_parses(monkeypatch):
+    calls = []
+    real = cache.parse_chat
+    monkeypatch.setattr(cache, "parse_chat", lambda *a: calls.append(a) or real(*a))
+    return calls
+
+def test_repeat_uploads_parse_once(tmp_path, monkeypatch):
+    calls = _count_parses(monkeypatch)
+    pc = ParseCache(tmp_path)
+    first = pc.get(CHAT)
+    assert pc.get(CHAT) is first
+    assert len(pc.get(CHAT, "UTC")) == 2  # timezone is part of the key
+    assert len(calls) == 2
+    # a fresh process finds the parquet spill instead of parsing
+    assert ParseCache(tmp_path).get(CHAT)["sender"].tolist() == ["Alice", "Bob"]
+    assert len(calls) == 2
+    assert not list(tmp_path.glob("*.txt"))
+
+def test_lru_is_size_bounded(tmp_path):
+    pc = ParseCache(tmp_path, max_bytes=1)
+    pc.get(CHAT)
+    pc.get(CHAT + b"12/10/2024, 10:17 - Bob: more\n")
+    assert len(pc._entries) == 1 and pc._bytes > 0
@@ -0,0 +1,36 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from src.analyzer import analyze
+from src.dashboard import DailyRollup
+from src.downsample import lttb
+from src.parser import parse_chat
+from benchmarks.synth import generate_export
+
+COUNT_SUMMARIES = ["basic_stats", "messages_per_sender", "daily_timeline",
+                   "hourly_timeline", "weekday_hour_heatmap"]
+
+def test_rollup_window_matches_filtered_analysis(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 5000))
+    rollup = pickle.loads(pickle.dumps(DailyRollup.from_frame(df)))  # as st.cache_data stores it
+    days = rollup.daily_counts().index
+    for since, until in [(None, None), (days[3], days[9]), (days[5], days[5]), (days[-1], None)]:
+        lo = df["date"].min() if since is None else since
+        hi = df["date"].max() if until is None else until
+        window, expected = rollup.between(since, until), analyze(df[df["date"].between(lo, hi)])
+        for name in COUNT_SUMMARIES:
+            got, want = getattr(window, name)(), getattr(expected, name)()
+            assert got == want if isinstance(got, dict) else got.equals(want), name
+    assert rollup.daily_counts().sum() == len(df)
+
+def test_lttb_keeps_ends_and_extremes():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=5000)
+    y[1234], y[4321] = 50, -50
+    keep = lttb(np.arange(5000), y, 200)
+    assert len(keep) == 200 and keep[0] == 0 and keep[-1] == 4999
+    assert (np.diff(keep) > 0).all() and {1234, 4321} <= set(keep)
+    assert (lttb(pd.date_range("2020", periods=50).astype("int64"), np.ones(50), 100) == np.arange(50)).all()
+    with pytest.raises(ValueError):
+        lttb([1, 2, 3], [1, 2, 3], 2)
@@ -0,0 +1,62 @@
+import filecmp
+import pandas as pd
+import pytest
+import src.incremental as incremental
+from src.analyzer import AnalysisResult, export_csv_summaries
+from src.incremental import checkpoint_path, update_incremental
+from src.parser import parse_chat
+
+BASE = (
+    "12/10/2024, 10:15 - Alice: Hello 😀\n"
+    "12/10/2024, 10:16 - Bob: Hi!\n"
+    "13/10/2024, 9:05 - Alice: how are you\n"
+)
+TAIL = (
+    "still typing\n"
+    "14/10/2024, 11:00 - Bob: fine https://example.com 👍🏽\n"
+    "14/10/2024, 11:01 - Carol joined\n"
+)
+
+def _same_summaries(aggregates, raw, tmp_path):
+    AnalysisResult(aggregates).export(tmp_path / "inc")
+    export_csv_summaries(parse_chat(raw), tmp_path / "full")
+    cmp = filecmp.dircmp(tmp_path / "inc", tmp_path / "full")
+    return not cmp.diff_files and not cmp.left_only and not cmp.right_only
+
+def test_appended_tail_is_merged(tmp_path, monkeypatch):
+    raw, proc = tmp_path / "chat.txt", tmp_path / "chat.parquet"
+    raw.write_text(BASE, encoding="utf-8")
+    update_incremental(raw, proc)
+    assert checkpoint_path(proc).exists()
+
+    with open(raw, "a", encoding="utf-8") as fh:
+        fh.write(TAIL)
+    monkeypatch.setattr(incremental, "parse_chat", pytest.fail)  # must not re-parse everything
+    df, aggregates = update_incremental(raw, proc)
+    monkeypatch.undo()
+
+    expected = parse_chat(raw)
+    pd.testing.assert_frame_equal(df.drop(columns="timestamp"), expected.drop(columns="timestamp"))
+    assert df["message"].iloc[2] == "how are you\nstill typing"
+    assert _same_summaries(aggregates, raw, tmp_path)
+
+def test_changed_prefix_rebuilds(tmp_path):
+    raw, proc = tmp_path / "chat.txt", tmp_path / "chat.parquet"
+    raw.write_text(BASE, encoding="utf-8")
+    update_incremental(raw, proc)
+    raw.write_text(BASE.replace("Hello", "Howdy") + TAIL, encoding="utf-8")
+    df, aggregates = update_incremental(raw, proc)
+    assert df["message"].iloc[0] == "Howdy 😀"
+    assert _same_summaries(aggregates, raw, tmp_path)
+
+def test_ambiguous_dates_are_reread_once_the_order_is_known(tmp_path):
+    raw, proc = tmp_path / "chat.txt", tmp_path / "chat.parquet"
+    raw.write_text("".join(f"{d}/2/2024, 10:00 - Alice: day {d}\n" for d in range(1, 8)), encoding="utf-8")
+    df, _ = update_incremental(raw, proc)
+    assert df["date"].dt.month.tolist() == list(range(1, 8))  # month-first guess
+    with open(raw, "a", encoding="utf-8") as fh:
+        fh.write("13/2/2024, 10:00 - Bob: proves day-first\n")
+    df, aggregates = update_incremental(raw, proc)
+    pd.testing.assert_frame_equal(df.drop(columns="timestamp"), parse_chat(raw).drop(columns="timestamp"))
+    assert df["date"].dt.month.unique().tolist() == [2]
+    assert _same_summaries(aggregates, raw, tmp_path)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synth import generate_export
+from src.analyzer import analyze
+from src.index import ChatIndex
+from src.parser import parse_chat
+
+def _mask(df, since=None, until=None, senders=None):
+    m = pd.Series(True, index=df.index)
+    if since is not None:
+        m &= df["date"] >= pd.Timestamp(since)
+    if until is not None:
+        m &= df["date"] <= pd.Timestamp(until)
+    if senders:
+        m &= df["sender"].isin(senders)
+    return df[m.fillna(False)]
+
+def test_index_queries_match_boolean_masks(tmp_path):
+    raw = generate_export(tmp_path / "chat.txt", 8000)
+    raw.write_text("preamble without a timestamp\n" + raw.read_text(encoding="utf-8"), encoding="utf-8")
+    df = parse_chat(raw)
+    idx = ChatIndex.build(df)
+    idx.save(tmp_path / "chat.index.npz")
+    idx = ChatIndex.load(tmp_path / "chat.index.npz")
+
+    queries = [{}, {"since": "2020-01-10"}, {"until": "2020-01-10"},
+               {"since": "2020-01-05", "until": "2020-01-12", "senders": ["Alice", "Bob"]},
+               {"senders": ["Eve"]}, {"since": "2030-01-01"}, {"senders": ["Nobody"]}]
+    for q in queries:
+        expected = _mask(df, **q)
+        got = idx.select(df, **q)
+        pd.testing.assert_frame_equal(got, expected, obj=str(q))
+    sub = idx.select(df, since="2020-01-05", until="2020-01-12")
+    assert analyze(sub).basic_stats() == analyze(_mask(df, "2020-01-05", "2020-01-12")).basic_stats()
+
+    daily = idx.daily_counts()
+    assert daily.sum() == df["timestamp"].notna().sum()
+    start, end = df["timestamp"].iloc[100], df["timestamp"].iloc[200]
+    rows = idx.rows_between(start, end)
+    np.testing.assert_array_equal(rows, np.flatnonzero((df["timestamp"] >= start) & (df["timestamp"] < end)))
+
+def test_pipeline_writes_index_next_to_table(tmp_path):
+    from src.index import index_path
+    from src.pipeline import run_full
+    raw = generate_export(tmp_path / "chat.txt", 2000)
+    res = run_full(raw, tmp_path, charts=[])
+    df = pd.read_parquet(res["processed"])
+    idx = ChatIndex.load(index_path(res["processed"]))
+    rows = idx.rows(since="2020-01-02", senders=["Carol"])
+    assert analyze(df, ["overall"], rows=rows).basic_stats()["participants"] == ["Carol"]
+
+def test_empty_export_parses_and_indexes(tmp_path):
+    from src.index import index_path
+    from src.parser import COLUMNS
+    from src.pipeline import write_table
+    raw = tmp_path / "empty.txt"
+    raw.write_text("", encoding="utf-8")
+    df = parse_chat(raw)
+    assert list(df.columns) == COLUMNS and df.empty
+    write_table(df, tmp_path / "empty.parquet")
+    idx = ChatIndex.load(index_path(tmp_path / "empty.parquet"))
+    assert idx.n_rows == 0 and len(idx.rows(since="2020-01-01", senders=["Alice"])) == 0
+    assert ChatIndex.build(pd.DataFrame()).daily_counts().empty
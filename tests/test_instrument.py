@@ -0,0 +1,32 @@
+import sys
+from benchmarks.synth import generate_export
+from src import cli, instrument
+from src.parser import parse_chat
+
+def test_stage_events_reach_subscribers(tmp_path):
+    path = generate_export(tmp_path / "chat.txt", 500)
+    events = []
+    instrument.subscribe(events.append)
+    try:
+        df = parse_chat(path)
+    finally:
+        instrument.unsubscribe(events.append)
+    names = {e.name for e in events}
+    assert {"parse.sniff", "parse.read_match", "parse.timestamps", "parse.enrich"} <= names
+    assert sum(e.rows for e in events if e.name == "parse.enrich") == len(df)
+    assert all(e.seconds >= 0 and e.peak_rss > 0 for e in events)
+    seen = len(events)
+    parse_chat(path)  # unsubscribed: nothing more is recorded
+    assert len(events) == seen
+
+def test_cli_profile_table(tmp_path, monkeypatch, capsys):
+    raw = generate_export(tmp_path / "chat.txt", 300)
+    monkeypatch.setattr(sys, "argv", ["cli", "full", "--input", str(raw), "--workdir", str(tmp_path),
+                                      "--charts", "hourly_timeline", "--profile",
+                                      "--profile-out", str(tmp_path / "run.pstats")])
+    cli.main()
+    out = capsys.readouterr().out
+    for stage in ("parse", "write", "analyze.counts", "analyze.export", "plot.hourly_timeline"):
+        assert f"\n{stage} " in out
+    assert (tmp_path / "run.pstats").exists()
+    assert not instrument.enabled()
@@ -0,0 +1,108 @@
+from pathlib import Path
+import pandas as pd
+from src.parser import parse_chat, iter_chat_batches
+from src.utils import compact_dtypes
+
+SAMPLE = (
+    "12/10/2024, 10:15 - Alice: Hello\n"
+    "12/10/2024, 10:16 - Bob: Hi!\n"
+    "second line\n"
+    "third line\n"
+    "12/10/2024, 10:17 - Bob created group \"x\"\n"
+    "13/10/2024, 9:05 pm - Alice: <Media omitted>\n"
+)
+
+def _write(tmp_path: Path, text: str = SAMPLE) -> Path:
+    p = tmp_path / "chat.txt"
+    p.write_text(text, encoding="utf-8")
+    return p
+
+def test_batches_keep_continuation_lines(tmp_path):
+    path = _write(tmp_path)
+    batches = list(iter_chat_batches(path, batch_size=1))
+    assert [len(b) for b in batches] == [1, 1, 1, 1]
+    assert batches[1]["message"].iloc[0] == "Hi!\nsecond line\nthird line"
+
+def test_parse_chat_matches_batches(tmp_path):
+    path = _write(tmp_path)
+    df = parse_chat(path)
+    # batches carry their own sender categories; compact_dtypes unifies them
+    streamed = compact_dtypes(pd.concat(iter_chat_batches(path, batch_size=2), ignore_index=True))
+    pd.testing.assert_frame_equal(df, streamed)
+    assert df["sender"].tolist()[:2] == ["Alice", "Bob"]
+
+def test_sniff_timestamp_format():
+    from src.parser import sniff_timestamp_format
+    assert sniff_timestamp_format(SAMPLE.splitlines()) == "%d/%m/%Y %H:%M"
+    assert sniff_timestamp_format(["[1/13/24, 9:05:01 PM] Bob: hi"]) == "%m/%d/%y %I:%M:%S %p"
+    assert sniff_timestamp_format(["no header here"]) is None
+
+def test_timestamps_use_detected_order_with_fallback(tmp_path):
+    df = parse_chat(_write(tmp_path))
+    # 12/10 is read day-first because 13/10 later in the export disambiguates
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-10-12"] * 3 + ["2024-10-13"]
+    # "9:05 pm" doesn't fit the detected 24h format and goes through dateutil
+    assert df["hour"].tolist()[-1] == 21
+
+def test_classify_line_variants():
+    from src.parser import classify_line
+    m = classify_line("12/10/2024, 10:15 pm - Alice: Hi: there")
+    assert (m["name"], m["msg"], m["ampm"]) == ("Alice", "Hi: there", "pm")
+    m = classify_line("[12/10/24, 10:15:01] Bob: yo")
+    assert (m["name"], m["time"]) == ("Bob", "10:15:01")
+    assert classify_line("12/10/2024, 10:15 - Bob left")["name"] is None
+    assert classify_line("[12/10/24, 10:15:01] Bob left")["name"] is None
+    assert classify_line("[12/10/24, 10:15:01] - Bob: mixed") is not None
+    assert classify_line("12/10/2024, 10:15] Bob: mixed") is None
+    assert classify_line("just text") is None
+    # boundaries (classify_line) and the parser's block scan share one grammar
+    from src.parser import BLOCK_PATTERN
+    lines = SAMPLE.splitlines()
+    assert [m.group() for m in BLOCK_PATTERN.finditer(SAMPLE)] == [l for l in lines if classify_line(l)]
+
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch):
+    import src.parser as parser
+    from benchmarks.synth import generate_export
+    path = generate_export(tmp_path / "big.txt", 3000, fmt="ios", multiline=0.5)
+    monkeypatch.setattr(parser, "MIN_RANGE_BYTES", 1024)
+    ranges = parser.split_ranges(path, 4)
+    assert len(ranges) == 4 and ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    pd.testing.assert_frame_equal(parse_chat(path, workers=4), parse_chat(path))
+
+def test_enrich_matches_whole_emoji_sequences(tmp_path):
+    from src.analyzer import emoji_freq
+    path = _write(tmp_path, "12/10/2024, 10:15 - Alice: hi 👍🏽 🇮🇳 👨‍👩‍👧 👍🏽\n"
+                            "12/10/2024, 10:16 - Bob: ‎image omitted\n")
+    df = parse_chat(path)
+    assert df["emoji_count"].tolist() == [4, 0]
+    assert df["is_media"].tolist() == [False, True]
+    assert df["weekday"].iloc[0] == "Tuesday" and df["time"].iloc[0] == "10:15:00"
+    ef = emoji_freq(df)
+    assert ef.iloc[0].tolist() == ["👍🏽", 2] and "👨‍👩‍👧" in ef["emoji"].tolist()
+
+def test_mapped_blocks_split_anywhere(tmp_path, monkeypatch):
+    from src import parser
+    text = ("intro before any header\n\n"
+            "‎[1/2/24, 10:00:00] Alice: ‎image omitted\r\n"
+            "[1/2/24, 10:01:00] Bob: multi\r\n\r\nline‎ body\r\n"
+            "not a header 1/2/24, 10:02 - X: y\n"
+            "[1/2/24, 10:03:00] Carol: no newline at end")
+    path = _write(tmp_path, text)
+    df = parse_chat(path)
+    assert df["message"].tolist() == ["intro before any header", "image omitted",
+                                      "multi\n\nline body\nnot a header 1/2/24, 10:02 - X: y",
+                                      "no newline at end"]
+    assert df["is_system"].tolist() == [True, False, False, False]
+    # blocks cutting through lines and messages give the same records
+    monkeypatch.setattr(parser, "_BLOCK", 5)
+    pd.testing.assert_frame_equal(parse_chat(path), df)
+
+def test_long_multiline_message(tmp_path):
+    body = "\n".join(f"pasted line {i}" for i in range(50_000))
+    df = parse_chat(_write(tmp_path, f"1/2/24, 10:00 - Alice: start\n{body}\n1/2/24, 10:05 - Bob: ok\n"))
+    assert df["message"].tolist() == ["start\n" + body, "ok"]
+
+def test_time_column_when_every_message_is_at_midnight(tmp_path):
+    df = parse_chat(_write(tmp_path, "12/10/2024, 00:00 - Alice: Hello\n13/10/2024, 00:00 - Bob: Hi\n"))
+    assert df["time"].tolist() == ["00:00:00", "00:00:00"]
+    assert parse_chat(_write(tmp_path))["time"].tolist() == ["10:15:00", "10:16:00", "10:17:00", "21:05:00"]
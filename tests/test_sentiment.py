@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+from src import analyzer, sentiment
+from src.analyzer import ChatAggregates, analyze
+from src.parser import parse_chat
+from benchmarks.synth import generate_export
+
+pytest.importorskip("vaderSentiment")
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Texts sent to VADER, per call."""
+    calls = []
+    score = sentiment._score_chunk
+    monkeypatch.setattr(sentiment, "_score_chunk", lambda texts: calls.append(list(texts)) or score(texts))
+    return calls
+
+def test_distinct_texts_are_scored_once_and_cached(tmp_path, scored):
+    msgs = pd.Series(["ok", "lol", "I love this!", "ok", "this is awful", "lol", None])
+    sentiment.configure(tmp_path / "cache")
+    first = sentiment.score_messages(msgs)
+    assert sorted(scored[0]) == ["I love this!", "lol", "ok", "this is awful"]
+    assert first.index.tolist() == [0, 1, 2, 3, 4, 5]
+    assert first[2] > sentiment.POSITIVE and first[4] < sentiment.NEGATIVE and first[0] == first[3]
+    assert first[2] == pytest.approx(sentiment._vader().polarity_scores("I love this!")["compound"], abs=1e-6)
+
+    # a new process (fresh cache object) only scores the texts it has not seen
+    sentiment.configure(tmp_path / "cache")
+    again = sentiment.score_messages(pd.Series(["ok", "great news", "lol"]))
+    assert scored[1:] == [["great news"]]
+    assert again[0] == first[0]
+    sentiment.configure()
+
+def test_sentiment_summaries(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 2000))
+    assert "sentiment_daily" not in analyzer.DEFAULT_SUMMARIES
+    names = list(analyzer.SENTIMENT_SUMMARIES)
+    res = analyze(df, names)
+    for name in names:
+        pd.testing.assert_frame_equal(res.summary(name), getattr(analyzer, name)(df), obj=name)
+    daily = res.sentiment_daily()
+    assert daily["messages"].sum() == len(analyzer._clean_messages(df))
+    assert daily["mean_compound"].between(-1, 1).all()
+    merged = ChatAggregates()
+    for i in range(0, len(df), 700):
+        merged.update(ChatAggregates.from_frame(df.iloc[i:i + 700], names))
+    pd.testing.assert_frame_equal(analyzer.AnalysisResult(merged).sentiment_senders(), res.sentiment_senders())
+    res.export(tmp_path / "out", names)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "summary_sentiment_daily.csv", "summary_sentiment_senders.csv"]
@@ -0,0 +1,39 @@
+import random
+from collections import Counter
+from src.sketch import SpaceSaving
+
+def _stream(n=50_000, seed=0):
+    rng = random.Random(seed)
+    return [f"w{int(rng.paretovariate(1.2))}" for _ in range(n)]
+
+def test_space_saving_bounds_and_merge():
+    words = _stream()
+    exact = Counter(words)
+    parts = [SpaceSaving(100).update(Counter(words[i:i + 2000])) for i in range(0, len(words), 2000)]
+    merged = SpaceSaving(100)
+    for p in reversed(parts):  # merge order does not matter for the guarantees
+        merged.update(p)
+    assert len(merged) <= 100 and merged.total == len(words)
+    assert merged.bound <= len(words) / 100
+    for w, c in merged.counts.items():
+        assert c - merged.errors[w] <= exact[w] <= c
+    assert all(w in merged.counts for w, c in exact.items() if c > merged.bound)
+    assert [w for w, _ in merged.most_common(10)] == [w for w, _ in exact.most_common(10)]
+    assert SpaceSaving.from_dict(merged.to_dict()) == merged
+
+def test_approx_mode_through_the_analyzer(tmp_path):
+    from benchmarks.synth import generate_export
+    from src.analyzer import ChatAggregates, analyze, top_words
+    from src.parser import parse_chat
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 3000, emoji=0.5))
+    exact = analyze(df).top_words(10)
+    approx = analyze(df, approx=20).top_words(10)
+    assert list(approx.columns) == ["word", "count", "error"]
+    assert approx["word"].tolist() == exact["word"].tolist()
+    assert top_words(df, 10, approx=20)["word"].tolist() == exact["word"].tolist()
+    # batches merged with sketches keep the bound on memory
+    agg = ChatAggregates()
+    for i in range(0, len(df), 700):
+        agg.update(ChatAggregates.from_frame(df.iloc[i:i + 700], approx=20))
+    assert len(agg.words) <= 20 and len(agg.emojis) <= 20
+    assert ChatAggregates.from_dict(agg.to_dict()) == agg
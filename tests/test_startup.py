@@ -0,0 +1,60 @@
+"""Each subcommand must only import what it uses (and stay within an import-time budget)."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from benchmarks.synth import generate_export
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("pandas", "matplotlib", "wordcloud", "emoji")
+
+# generous ceilings on total import time (seconds) so slow CI machines still pass
+BUDGETS = {"help": 0.3, "parse": 2.0, "analyze": 2.5}
+
+_PROBE = """
+import json, sys
+from src import cli
+sys.argv = ["cli"] + json.loads(sys.argv[1])
+try:
+    cli.main()
+except SystemExit:
+    pass
+print("@@" + json.dumps([m for m in {heavy} if m in sys.modules]))
+"""
+
+def _run(argv: list[str]) -> tuple[list[str], float]:
+    """Run a CLI command in a fresh interpreter; return the heavy modules loaded and import seconds."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE.format(heavy=HEAVY),
+                           json.dumps(argv)], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = json.loads(proc.stdout.split("@@")[-1])
+    # top-level entries (no indentation) carry the cumulative time of everything below them
+    micros = sum(int(line.split("|")[1]) for line in proc.stderr.splitlines()
+                 if line.startswith("import time:") and not line.split("|")[2].startswith("  ")
+                 and line.split("|")[1].strip().isdigit())
+    return loaded, micros / 1e6
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("startup")
+    raw = generate_export(tmp / "chat.txt", 300, emoji=0)  # ASCII only: emoji data is never needed
+    return tmp, raw
+
+def test_help_imports_nothing_heavy():
+    loaded, secs = _run(["--help"])
+    assert loaded == []
+    assert secs < BUDGETS["help"]
+
+def test_parse_skips_plotting_and_emoji(files):
+    tmp, raw = files
+    loaded, secs = _run(["parse", "--input", str(raw), "--output", str(tmp / "chat.parquet")])
+    assert "pandas" in loaded and not {"matplotlib", "wordcloud", "emoji"} & set(loaded)
+    assert secs < BUDGETS["parse"]
+
+def test_analyze_skips_plotting(files):
+    tmp, raw = files
+    _run(["parse", "--input", str(raw), "--output", str(tmp / "chat.parquet")])
+    loaded, secs = _run(["analyze", "--input", str(tmp / "chat.parquet"), "--outdir", str(tmp / "reports")])
+    assert (tmp / "reports" / "summary_overall.csv").exists()
+    assert not {"matplotlib", "wordcloud"} & set(loaded)
+    assert secs < BUDGETS["analyze"]
@@ -0,0 +1,17 @@
+import filecmp
+import src.parser as parser
+from benchmarks.synth import generate_export
+from src.analyzer import ChatAggregates, export_csv_summaries
+from src.parser import parse_chat
+from src.stream import aggregate_stream, summarize_stream
+
+def test_streamed_summaries_match_full_table(tmp_path, monkeypatch):
+    raw = generate_export(tmp_path / "chat.txt", 4000, fmt="ios", multiline=0.4, emoji=0.5)
+    export_csv_summaries(parse_chat(raw), tmp_path / "full")
+    summarize_stream(raw, tmp_path / "stream", batch_size=97)
+    names = sorted(p.name for p in (tmp_path / "full").iterdir())
+    match, mismatch, errors = filecmp.cmpfiles(tmp_path / "full", tmp_path / "stream", names, shallow=False)
+    assert mismatch == [] and errors == []
+
+    monkeypatch.setattr(parser, "MIN_RANGE_BYTES", 1024)
+    assert aggregate_stream(raw, workers=3, batch_size=500) == ChatAggregates.from_frame(parse_chat(raw))
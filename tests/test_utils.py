@@ -0,0 +1,62 @@
+import pandas as pd
+from src.parser import parse_chat
+from src.utils import DTYPES, read_table, save_df
+from benchmarks.synth import generate_export
+
+def test_parquet_roundtrip_keeps_compact_dtypes(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 500))
+    save_df(df, tmp_path / "chat.parquet")
+    back = read_table(tmp_path / "chat.parquet")
+    for col, dtype in DTYPES.items():
+        assert back[col].dtype == dtype, col
+    pd.testing.assert_frame_equal(back.drop(columns="timestamp"), df.drop(columns="timestamp"))
+
+def test_memory_report(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 20_000))
+    # what the parser used to return: Python objects in every text/label column
+    legacy = df.astype({c: object for c in ("date", "time", "weekday", "sender", "message",
+                                             "is_system", "is_media", "emoji_list")})
+    legacy["hour"] = df["hour"].astype("float64")
+    legacy["emoji_count"] = df["emoji_count"].astype("int64")
+    before = legacy.memory_usage(deep=True)
+    after = df.memory_usage(deep=True)
+    print("\n" + pd.DataFrame({"before": before, "after": after}).to_string())
+    print(f"total: {before.sum():,} -> {after.sum():,} bytes ({before.sum() / after.sum():.1f}x)")
+    assert before.sum() / after.sum() > 3
+
+def test_partitioned_dataset_roundtrip_and_filters(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 20_000))
+    save_df(df, tmp_path / "chat.parquet")
+    save_df(df, tmp_path / "ds", partition=True)
+    assert sorted(p.name for p in (tmp_path / "ds" / "year=2020").iterdir()) == ["month=1", "month=2", "month=3"]
+    back = read_table(tmp_path / "ds")
+    pd.testing.assert_frame_equal(back.drop(columns="timestamp"), df.drop(columns="timestamp"))
+
+    filters = {"since": "2020-02-01", "until": "2020-02-29", "senders": ["Alice", "Bob"]}
+    expected = df[(df["date"] >= "2020-02-01") & (df["date"] <= "2020-02-29")
+                  & df["sender"].isin(["Alice", "Bob"])].reset_index(drop=True)
+    for path in (tmp_path / "ds", tmp_path / "chat.parquet"):
+        got = read_table(path, **filters)
+        pd.testing.assert_frame_equal(got.drop(columns="timestamp"), expected.drop(columns="timestamp"))
+
+def test_csv_table_analyzes_like_parquet(tmp_path):
+    from src.analyzer import analyze
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 1000))
+    save_df(df, tmp_path / "chat.csv")
+    back = read_table(tmp_path / "chat.csv")
+    assert (back["timestamp"] == df["timestamp"]).all()
+    want, got = analyze(df), analyze(back)
+    for name in ("reply_times", "reply_matrix", "sessions"):
+        pd.testing.assert_frame_equal(got.summary(name), want.summary(name), check_dtype=False)
+
+def test_tables_without_link_columns_are_completed_on_read(tmp_path):
+    from src.analyzer import analyze, columns_for
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 1000, links=0.2))
+    for name in ("old.parquet", "old.csv"):
+        save_df(df.drop(columns=["link_count", "link_domains"]), tmp_path / name)
+        back = read_table(tmp_path / name)
+        pd.testing.assert_frame_equal(back[["link_count", "link_domains"]], df[["link_count", "link_domains"]])
+        projected = read_table(tmp_path / name, columns=columns_for(["overall", "top_domains"]))
+        assert "message" not in projected.columns
+        got = analyze(projected, ["overall", "top_domains"])
+        assert got.basic_stats()["links_shared"] == int(df["link_count"].sum()) > 0
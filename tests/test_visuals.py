@@ -0,0 +1,22 @@
+import pytest
+from src.parser import parse_chat
+from src.visuals import CHARTS, plot_all
+from benchmarks.synth import generate_export
+
+def test_plot_all_renders_selected_charts(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 300))
+    out = tmp_path / "reports"
+    timings = plot_all(df, out, charts=["hourly_timeline", "emoji_top"], workers=2)
+    assert list(timings) == ["hourly_timeline", "emoji_top"]
+    assert sorted(p.name for p in out.iterdir()) == ["chart_emoji_top.png", "chart_hourly_timeline.png"]
+
+def test_plot_all_rejects_unknown_chart(tmp_path):
+    with pytest.raises(ValueError, match="nope"):
+        plot_all(None, tmp_path, charts=["nope"])
+    assert "wordcloud" in CHARTS
+
+def test_conversation_charts_render(tmp_path):
+    df = parse_chat(generate_export(tmp_path / "chat.txt", 300))
+    out = tmp_path / "reports"
+    plot_all(df, out, charts=["reply_times", "reply_matrix", "session_lengths"], workers=1)
+    assert len(list(out.glob("chart_*.png"))) == 3